@@ -1,12 +1,15 @@
-import sys, os, json, re, shutil, time, threading, unicodedata, shutil
+import sys, os, json, re, copy, shutil, time, hashlib, threading, unicodedata, shutil, contextlib
 import server as _sb__force_include
+import http.client
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 from PyQt5.QtCore import Qt, QStandardPaths, pyqtSignal, QTimer
 
 PLAYER_SLOTS = 5
-from PyQt5.QtGui import QPixmap, QColor
+from PyQt5.QtGui import QPixmap, QColor, QImage
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QComboBox, QSpinBox, QCheckBox,
@@ -22,6 +25,9 @@ from PyQt5.QtWidgets import (
 DEV_ASSET_DIRS = {
     "maps":      os.path.join("Scoreboard", "Maps"),
 }
+# Match/match.json = tila ilman assetteja; nämä avaimet muuttavat sen sisältöä
+MATCH_JSON_KEYS = ("team1", "team2", "maps", "current_map", "tournament_faceit", "statistics",
+                   "general", "waiting", "standings", "bracket")
 
 def _bundled_scoreboard_dir():
     """
@@ -118,6 +124,7 @@ class WaitingSettings:
     socials: Dict[str, str] = None
     ticker_override: str = ""
     ticker_override_enabled: bool = False
+    timer_ends_at: float = 0.0   # epoch-sekunnit kun ajastin käy (overlayt laskevat itse), muuten 0
 
 @dataclass
 class StandingsRow:
@@ -1046,6 +1053,238 @@ def _norm_rel(path: str, root: str) -> str:
     rel = os.path.relpath(path, root)
     return rel.replace("\\", "/")
 
+
+class ExportWriter:
+    """
+    Scoreboard-tiedostojen kirjoittaja sisältö-hash-manifestilla.
+    - Muuttumatonta sisältöä ei kirjoiteta eikä tiedostoa lueta vertailua varten:
+      manifestin (sha1, mtime, koko) ja yhden stat-kutsun perusteella tiedetään, onko levyn sisältö sama.
+    - Muuttunut tiedosto kirjoitetaan temp-tiedostoon ja vaihdetaan os.replace:lla,
+      joten overlay ei koskaan lue puoliksi kirjoitettua tiedostoa.
+    - transaction(): saman päivityksen tiedostot kerätään muistiin ja muuttuneet kirjoitetaan lopuksi kerralla.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._manifest: Dict[str, tuple] = {}   # path -> (sha1, mtime_ns, size)
+        self._pending: Optional[Dict[str, bytes]] = None
+        self._owner: Optional[int] = None
+
+    @staticmethod
+    def _stat(path: str) -> Optional[tuple]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _disk_digest(self, path: str) -> Optional[str]:
+        st = self._stat(path)
+        if st is None:
+            return None
+        entry = self._manifest.get(path)
+        if entry is None or entry[1:] != st:
+            # Ei vielä manifestissa tai muutettu muualta -> luetaan kerran.
+            try:
+                with open(path, "rb") as f:
+                    entry = (hashlib.sha1(f.read()).hexdigest(),) + st
+            except OSError:
+                return None
+            self._manifest[path] = entry
+        return entry[0]
+
+    def _is_current(self, path: str, digest: str) -> bool:
+        return self._disk_digest(path) == digest
+
+    def _commit(self, path: str, data: bytes, digest: str) -> bool:
+        """Kirjoita tiedosto; epäonnistuessa loki ja vanha sisältö jää paikalleen (False)."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(data)
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(tmp, "wb") as f:
+                    f.write(data)
+            for attempt in range(5):
+                try:
+                    os.replace(tmp, path)
+                    break
+                except PermissionError:
+                    # Windows: lukija (OBS/serveri) pitää kohdetta hetken auki.
+                    if attempt == 4:
+                        raise
+                    time.sleep(0.02)
+        except OSError as e:
+            print(f"[export] write failed {path}: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+        st = self._stat(path)
+        if st is not None:
+            self._manifest[path] = (digest,) + st
+        return True
+
+    def write_bytes(self, path: str, data: bytes) -> bool:
+        """Palauttaa True jos sisältö muuttui (kirjoitettiin tai kirjoitetaan transaktion lopussa)."""
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            if self._pending is not None and self._owner == threading.get_ident():
+                self._pending[path] = data
+                return not self._is_current(path, digest)
+            if self._is_current(path, digest):
+                return False
+            return self._commit(path, data, digest)
+
+    def write_text(self, path: str, text: str) -> bool:
+        return self.write_bytes(path, (text or "").encode("utf-8"))
+
+    def digest(self, path: str) -> Optional[str]:
+        """Tiedoston nykyinen sha1 (transaktiossa odottava sisältö huomioiden); None jos tiedostoa ei ole."""
+        with self._lock:
+            if self._pending is not None and self._owner == threading.get_ident() and path in self._pending:
+                return hashlib.sha1(self._pending[path]).hexdigest()
+            return self._disk_digest(path)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        with self._lock:
+            owns = self._pending is None
+            if owns:
+                self._pending = {}
+                self._owner = threading.get_ident()
+        try:
+            yield
+        finally:
+            if owns:
+                with self._lock:
+                    pending, self._pending, self._owner = self._pending, None, None
+                    for path, data in pending.items():
+                        digest = hashlib.sha1(data).hexdigest()
+                        if not self._is_current(path, digest):
+                            self._commit(path, data, digest)
+
+
+class ImageCache:
+    """
+    Kuvien sisältö-hash-välimuisti logoille ym.
+    - Lähteen sha1 lasketaan uudelleen vain, kun tiedoston (mtime, koko) muuttuu.
+    - PNG-lähde käytetään sellaisenaan; muut muodot (JPEG, WebP, ...) muunnetaan PNG:ksi kerran
+      ja muunnos tallennetaan <cache_dir>/<sha1>.png, joten sama kuva ei muunnu uudelleen edes uudelleenkäynnistyksen jälkeen.
+    Käyttää QImagea (ei QPixmapia), joten toimii myös taustasäikeessä.
+    """
+
+    PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+    MAX_MEMORY_ITEMS = 64
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._sources: Dict[str, tuple] = {}   # abs path -> ((mtime_ns, size), sha1)
+        self._png: Dict[str, bytes] = {}       # lähteen sha1 -> PNG-tavut
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def png_bytes(self, src_path: str) -> Optional[bytes]:
+        """Palauta lähdekuva PNG-tavuina (None jos ei luettavissa)."""
+        key = os.path.abspath(src_path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            return None
+        sig = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            hit = self._sources.get(key)
+            if hit is not None and hit[0] == sig and hit[1] in self._png:
+                return self._png[hit[1]]
+
+        try:
+            with open(key, "rb") as f:
+                raw = f.read()
+        except OSError:
+            return None
+        digest = hashlib.sha1(raw).hexdigest()
+        data = raw if raw.startswith(self.PNG_MAGIC) else self._converted(digest, raw)
+        if data is None:
+            return None
+
+        with self._lock:
+            self._sources[key] = (sig, digest)
+            self._png[digest] = data
+            while len(self._png) > self.MAX_MEMORY_ITEMS:
+                self._png.pop(next(iter(self._png)))
+        return data
+
+    def source_digest(self, src_path: str) -> Optional[str]:
+        """Lähdetiedoston sha1 (luetaan vain kun (mtime, koko) muuttui); None jos ei luettavissa."""
+        key = os.path.abspath(src_path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            return None
+        sig = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            hit = self._sources.get(key)
+            if hit is not None and hit[0] == sig:
+                return hit[1]
+        try:
+            with open(key, "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            return None
+        with self._lock:
+            self._sources[key] = (sig, digest)
+        return digest
+
+    def variant_bytes(self, src_path: str, size: tuple) -> Optional[bytes]:
+        """
+        Palauta lähteestä overlay-kokoinen PNG (size = (leveys, korkeus, cover)).
+        cover=True täyttää laatikon (CSS background-size: cover), muuten mahtuu laatikkoon.
+        Pientä kuvaa ei suurenneta. Tulos talletetaan <cache_dir>/<sha1>-<w>x<h>[c].png.
+        """
+        data = self.png_bytes(src_path)
+        if data is None:
+            return None
+        w, h, cover = size
+        path = os.path.join(self.cache_dir, f"{hashlib.sha1(data).hexdigest()}-{w}x{h}{'c' if cover else ''}.png")
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            pass
+        img = QImage()
+        if not img.loadFromData(data):
+            return None
+        mode = Qt.KeepAspectRatioByExpanding if cover else Qt.KeepAspectRatio
+        scaled = img.scaled(w, h, mode, Qt.SmoothTransformation)
+        if scaled.width() >= img.width() or scaled.height() >= img.height():
+            return data
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        if not scaled.save(tmp, "PNG"):
+            return None
+        os.replace(tmp, path)
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _converted(self, digest: str, raw: bytes) -> Optional[bytes]:
+        path = os.path.join(self.cache_dir, digest + ".png")
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            pass
+        img = QImage()
+        if not img.loadFromData(raw):
+            return None
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        if not img.save(tmp, "PNG"):
+            return None
+        os.replace(tmp, path)
+        with open(path, "rb") as f:
+            return f.read()
+
 class WaitingTab(QWidget):
     updated = pyqtSignal()
 
@@ -1102,11 +1341,14 @@ class WaitingTab(QWidget):
         root.addWidget(box_t)
 
         from PyQt5.QtCore import QTimer
+        # QTimer päivittää vain GUI:n oman näytön; overlayt saavat loppumishetken ja laskevat itse.
         self._qtimer = QTimer(self)
-        self._qtimer.setInterval(1000)
+        self._qtimer.setInterval(250)
         self._qtimer.timeout.connect(self._tick)
         self._preset_seconds = 0
-        self._remaining_seconds = 0
+        self._remaining_seconds = 0   # jäljellä käynnistys-/pysäytyshetkellä
+        self._deadline = 0.0          # time.monotonic() kun ajastin loppuu
+        self._ends_at = 0.0           # sama seinäkellona (time.time()) overlayta varten
 
         for w in (self.min_spin, self.sec_spin):
             w.valueChanged.connect(self._on_preset_changed)
@@ -1174,15 +1416,27 @@ class WaitingTab(QWidget):
             self.live_label.setText(self._fmt(self._remaining_seconds))
         self.updated.emit()
         
+    def _live_remaining(self) -> int:
+        if self._qtimer.isActive():
+            return max(0, int(self._deadline - time.monotonic() + 0.999))
+        return self._remaining_seconds
+
     def _start_timer(self):
+        if self._qtimer.isActive():
+            return
         if self._remaining_seconds <= 0:
             self._remaining_seconds = self._preset_seconds
+        self._deadline = time.monotonic() + self._remaining_seconds
+        self._ends_at = time.time() + self._remaining_seconds
         self._qtimer.start()
         self.updated.emit()
 
     def _pause_timer(self):
         if self._qtimer.isActive():
+            self._remaining_seconds = self._live_remaining()
             self._qtimer.stop()
+            self._ends_at = 0.0
+            self.live_label.setText(self._fmt(self._remaining_seconds))
             self.updated.emit()
 
     def _on_ticker_override_toggled(self, checked: bool):
@@ -1190,16 +1444,19 @@ class WaitingTab(QWidget):
 
     def _reset_timer_clicked(self):
         self._qtimer.stop()
+        self._ends_at = 0.0
         self._remaining_seconds = self._preset_seconds
         self.live_label.setText(self._fmt(self._remaining_seconds))
         self.updated.emit()
 
     def _tick(self):
-        self._remaining_seconds = max(0, self._remaining_seconds - 1)
-        self.live_label.setText(self._fmt(self._remaining_seconds))
-        if self._remaining_seconds <= 0:
+        secs = self._live_remaining()
+        self.live_label.setText(self._fmt(secs))
+        if secs <= 0:
             self._qtimer.stop()
-        self.updated.emit()
+            self._remaining_seconds = 0
+            self._ends_at = 0.0
+            self.updated.emit()
 
 
     def _on_use_default_toggled(self, checked: bool):
@@ -1250,11 +1507,15 @@ class WaitingTab(QWidget):
             socials=socials,
             ticker_override=self.ticker_override_edit.text().strip(),
             ticker_override_enabled=bool(self.ticker_override_chk.isChecked()),
+            timer_ends_at=self._ends_at if self._qtimer.isActive() else 0.0,
         )
 
 
     def from_settings(self, s: WaitingSettings):
         secs = int(getattr(s, "timer_seconds", 0) or 0)
+        ends_at = float(getattr(s, "timer_ends_at", 0.0) or 0.0)
+        if getattr(s, "timer_running", False) and ends_at > 0:
+            secs = max(0, int(ends_at - time.time() + 0.999))
         self._remaining_seconds = max(0, secs)
         self._preset_seconds = self._remaining_seconds
         self.min_spin.setValue(self._preset_seconds // 60)
@@ -2301,10 +2562,365 @@ class BulkImportDialog(QDialog):
     def results(self):
         return [r.to_result() for r in self.rows]
 
+# -----------------------------
+# FACEIT Data API cache
+# -----------------------------
+FACEIT_MAX_CONCURRENCY = 6      # samanaikaisia FACEIT-pyyntöjä enintään
+FACEIT_MAX_RETRIES = 3          # 429/503 -uusintayritykset per pyyntö
+FACEIT_MAX_RETRY_DELAY = 30.0   # sekuntia
+
+
+class FaceitResponseCache:
+    """
+    FACEIT Data API -vastausten levyvälimuisti, avaimena URL.
+    Tavalliset vastaukset revalidoidaan ETag/Last-Modified -otsakkeilla;
+    permanent=True -vastaukset (valmiiden otteluiden tilastot) palautetaan suoraan levyltä.
+    Verkkopyyntöjä on käynnissä korkeintaan max_concurrency kerrallaan, ja 429/503
+    -vastauksen jälkeen kaikki säikeet odottavat Retry-Afterin (tai eksponentiaalisen viiveen) verran.
+    """
+
+    def __init__(self, cache_dir: str, max_concurrency: int = FACEIT_MAX_CONCURRENCY):
+        self.cache_dir = cache_dir
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._lock = threading.Lock()
+        self._mem: Dict[str, dict] = {}
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._cooldown_until = 0.0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _load(self, url: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._mem.get(url)
+        if entry is not None:
+            return entry
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except Exception:
+            return None
+        if not isinstance(entry, dict) or entry.get("url") != url:
+            return None
+        with self._lock:
+            self._mem[url] = entry
+        return entry
+
+    def _store(self, url: str, entry: dict):
+        with self._lock:
+            self._mem[url] = entry
+        path = self._path(url)
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(path + ".tmp", path)
+        except Exception as e:
+            print(f"[faceit-cache] write failed: {e}")
+
+    def get_json(self, url: str, headers: Optional[dict] = None, *, timeout: float = 8.0, permanent: bool = False):
+        """Palauta URL:n JSON; HTTP-virheet nousevat kuten urlopenista, verkkokatkolla käytetään välimuistia."""
+        import urllib.request, urllib.error
+
+        entry = self._load(url)
+        if permanent and entry is not None and entry.get("permanent"):
+            return entry.get("body")
+
+        req_headers = dict(headers or {})
+        if entry is not None:
+            if entry.get("etag"):
+                req_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                req_headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            body, etag, last_modified = self._request(url, req_headers, timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and entry is not None:
+                if permanent:
+                    self._store(url, dict(entry, permanent=True))
+                return entry.get("body")
+            raise
+        except (urllib.error.URLError, OSError):
+            if entry is not None:
+                return entry.get("body")
+            raise
+
+        self._store(url, {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "permanent": bool(permanent),
+            "fetched_at": time.time(),
+            "body": body,
+        })
+        return body
+
+    def _request(self, url: str, headers: dict, timeout: float):
+        """Yksi GET rinnakkaisuusrajan sisällä; 429/503 -> odota ja yritä uudelleen."""
+        import urllib.request, urllib.error
+
+        for attempt in range(FACEIT_MAX_RETRIES + 1):
+            wait = self._cooldown_until - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                with self._slots:
+                    req = urllib.request.Request(url, headers=headers)
+                    with urllib.request.urlopen(req, timeout=timeout) as resp:
+                        body = json.loads(resp.read().decode("utf-8", errors="ignore"))
+                        return body, resp.headers.get("ETag") or "", resp.headers.get("Last-Modified") or ""
+            except urllib.error.HTTPError as e:
+                if e.code not in (429, 503) or attempt >= FACEIT_MAX_RETRIES:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                with self._lock:
+                    self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+
+    @staticmethod
+    def _retry_delay(err, attempt: int) -> float:
+        try:
+            delay = float((err.headers.get("Retry-After") or "").strip())
+        except (AttributeError, ValueError):
+            delay = 0.5 * (2 ** attempt)
+        return min(max(delay, 0.0), FACEIT_MAX_RETRY_DELAY)
+
+
+class FaceitTournamentStatsStore:
+    """
+    Turnaustilastojen pysyvä varasto (yksi JSON-tiedosto):
+    - matches: valmiiden otteluiden puretut joukkuetilastot ottelu-ID:n mukaan
+    - aggregates: joukkueparikohtainen juokseva summa ja siihen jo lasketut ottelut
+    """
+
+    MAX_AGGREGATES = 16
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data = {"matches": {}, "aggregates": {}}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._data["matches"] = dict(data.get("matches") or {})
+                self._data["aggregates"] = dict(data.get("aggregates") or {})
+        except Exception:
+            pass
+
+    def match_teams(self, match_id: str) -> Optional[List[dict]]:
+        teams = self._data["matches"].get(match_id)
+        return teams if isinstance(teams, list) else None
+
+    def put_match(self, match_id: str, teams: List[dict]):
+        self._data["matches"][match_id] = teams
+
+    def aggregate(self, key: str) -> Optional[dict]:
+        agg = self._data["aggregates"].get(key)
+        if not isinstance(agg, dict) or not isinstance(agg.get("folded"), list) or not isinstance(agg.get("combined"), dict):
+            return None
+        return agg
+
+    def put_aggregate(self, key: str, agg: dict):
+        aggregates = self._data["aggregates"]
+        aggregates.pop(key, None)
+        aggregates[key] = agg
+        while len(aggregates) > self.MAX_AGGREGATES:
+            aggregates.pop(next(iter(aggregates)))
+
+    def save(self):
+        try:
+            with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False)
+            os.replace(self.path + ".tmp", self.path)
+        except Exception as e:
+            print(f"[faceit-cache] tournament stats write failed: {e}")
+
+
+# -----------------------------
+# Local server channel
+# -----------------------------
+class ServerChannel:
+    """
+    GUI -> paikallispalvelin (/state, /statistics, /notify).
+    - Upotettu palvelin (sama prosessi): viesti annetaan suoraan palvelimen muistiin, ilman socketia.
+    - Erillinen server.py (launch.py): viestit jonoon, ja taustasäie lähettää ne samassa järjestyksessä
+      yhden pysyvän HTTP/1.1-yhteyden yli. GUI-säie ei kummassakaan tapauksessa odota verkkoa.
+    - /state erilliselle palvelimelle kirjoitetaan jaettuun muistiin (server.StateSegment) koko
+      yhdistettynä statena kerran per päivitys; HTTP:tä käytetään vain, jos segmenttiä ei ole tai se ei riitä.
+    """
+
+    MAX_QUEUED = 256
+
+    def __init__(self, embedded=None, host: str = "127.0.0.1", port: int = 8324, segment=None):
+        self.embedded = embedded
+        self.host = host
+        self.port = port
+        self.segment = segment
+        self._state: dict = {}
+        self._queue = deque()
+        self._cv = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def post(self, route: str, payload: dict):
+        if self.embedded is not None:
+            try:
+                self.embedded.deliver(route, payload)
+            except Exception as e:
+                print(f"[server] {route} failed: {e}")
+            return
+        if route == "/state" and self.segment is not None:
+            # Sama yhdistäminen kuin palvelimen _update_state: patch korvaa ylimmän tason avaimet.
+            self._state = {**self._state, **payload}
+            body = json.dumps(self._state, ensure_ascii=False).encode("utf-8")
+            if self.segment.write(body):
+                return
+            print(f"[server] state ({len(body)} bytes) does not fit the shared segment, posting it")
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        with self._cv:
+            if len(self._queue) >= self.MAX_QUEUED:
+                self._queue.popleft()   # palvelin ei vastaa -> vanhimmat pois
+            self._queue.append((route, body))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ServerChannel", daemon=True)
+                self._thread.start()
+            self._cv.notify()
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while not self._queue:
+                    self._cv.wait()
+                route, body = self._queue.popleft()
+            self._send(route, body)
+
+    def _send(self, route: str, body: bytes):
+        # Toinen yritys uudella yhteydellä, jos palvelin sulki vanhan (esim. käynnistettiin uudelleen).
+        for _ in range(2):
+            try:
+                if self._conn is None:
+                    self._conn = http.client.HTTPConnection(self.host, self.port, timeout=2.0)
+                self._conn.request("POST", route, body, {"Content-Type": "application/json"})
+                self._conn.getresponse().read()
+                return
+            except Exception:
+                if self._conn is not None:
+                    self._conn.close()
+                self._conn = None
+
+
+# -----------------------------
+# Image variants
+# -----------------------------
+# Kuvat, joiden sisältötunniste julkaistaan revisions.json:ssa (polut Scoreboard-kansion alla).
+REVISIONED_IMAGES = (
+    "General/OverlayLogo.png",
+    "General/TransitionLogo.png",
+    "Match/T1Logo.png",
+    "Match/T2Logo.png",
+)
+# Logojen overlay-kokoiset versiot (ImageVariantWorker); tunniste vasta kun tiedosto on kirjoitettu.
+REVISIONED_VARIANTS = (
+    "Match/variants/T1Logo-logo.png",
+    "Match/variants/T2Logo-logo.png",
+)
+IMAGE_VARIANT_SIZES = {
+    "card": (640, 780, True),    # maps.html / draft.html karttakortit (background-size: cover)
+    "logo": (320, 320, False),   # joukkuelogot overlayssa (näytöllä enintään ~300 px)
+    "thumb": (64, 64, False),    # bracketin rivilogot (32 px, 2x)
+}
+
+
+class ImageVariantWorker:
+    """
+    Tuottaa overlay-kokoiset kuvaversiot taustasäikeessä (ks. IMAGE_VARIANT_SIZES).
+    - submit() ohittaa työn, jos kohde on jo tehty tai jonossa samasta lähdesisällöstä (sha1, koko);
+      muuten se korvaa saman kohteen aiemman odottavan työn.
+    - revision(dst) = kirjoitetun version sisältötunniste (sha1-alku); None kun versiota ei ole
+      tai uusi on vielä kesken -> indeksit julkaisevat vain valmiin tiedoston tunnisteen.
+    - Kun erä on valmis, on_done(tags) kutsutaan sen töiden tagien kanssa.
+    """
+
+    def __init__(self, images: ImageCache, writer: ExportWriter, on_done: Callable[[set], None]):
+        self._images = images
+        self._writer = writer
+        self._on_done = on_done
+        self._cv = threading.Condition()
+        self._jobs: Dict[str, tuple] = {}     # dst -> (avain, src, variant, tag); avain = (lähteen sha1, variant)
+        self._active: Dict[str, tuple] = {}   # dst -> avain, käsittelyssä juuri nyt
+        self._done: Dict[str, tuple] = {}     # dst -> (avain, tunniste) viimeksi kirjoitetusta
+        self._running = False
+
+    def submit(self, src_path: str, dst_path: str, variant: str, tag: str):
+        digest = self._images.source_digest(src_path)
+        if digest is None:
+            return
+        key = (digest, variant)
+        dst = os.path.normpath(dst_path)
+        with self._cv:
+            if dst in self._jobs:
+                latest = self._jobs[dst][0]
+            elif dst in self._active:
+                latest = self._active[dst]
+            else:
+                latest = (self._done.get(dst) or (None,))[0]
+            if latest == key:
+                return
+            self._jobs[dst] = (key, src_path, variant, tag)
+            if not self._running:
+                self._running = True
+                threading.Thread(target=self._run, name="ImageVariants", daemon=True).start()
+
+    def _run(self):
+        while True:
+            with self._cv:
+                if not self._jobs:
+                    self._running = False
+                    return
+                jobs, self._jobs = self._jobs, {}
+                self._active = {dst: job[0] for dst, job in jobs.items()}
+            tags = set()
+            for dst, (key, src, variant, tag) in jobs.items():
+                token = None
+                try:
+                    data = self._images.variant_bytes(src, IMAGE_VARIANT_SIZES[variant])
+                    if data is not None:
+                        digest = hashlib.sha1(data).hexdigest()
+                        self._writer.write_bytes(dst, data)
+                        if self._writer.digest(dst) == digest:
+                            token = digest[:12]
+                except Exception as e:
+                    print(f"[variants] {src} -> {dst} failed: {e}")
+                with self._cv:
+                    self._active.pop(dst, None)
+                    if token is not None:
+                        self._done[dst] = (key, token)
+                # Kesken ollessa indeksit jättivät version pois -> julkaistaan uudelleen myös
+                # epäonnistuessa (silloin levyllä ja tunnisteena pysyy edellinen versio).
+                tags.add(tag)
+            if tags:
+                try:
+                    self._on_done(tags)
+                except Exception as e:
+                    print(f"[variants] callback failed: {e}")
+
+    def revision(self, dst_path: str) -> Optional[str]:
+        dst_path = os.path.normpath(dst_path)
+        with self._cv:
+            if dst_path in self._jobs or dst_path in self._active:
+                return None
+            done = self._done.get(dst_path)
+            return done[1] if done else None
+
+
 # -----------------------------
 # Main Window
 # -----------------------------
 class TournamentApp(QMainWindow):
+    # ImageVariantWorkerin valmistumisilmoitus taustasäikeestä GUI-säikeeseen
+    variants_ready = pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("CSBroadcast")
@@ -2320,9 +2936,33 @@ class TournamentApp(QMainWindow):
         self.current_save_path: Optional[str] = None
         self.export_dir = os.path.join(self.app_dir, "exports")
         os.makedirs(self.export_dir, exist_ok=True)
+        self._writer = ExportWriter()
+        self._server_channel = ServerChannel(_embedded_server, segment=self._open_state_segment(base_root))
+        self._images = ImageCache(os.path.join(self.app_dir, "image_cache"))
+        self.variants_ready.connect(self._on_variants_ready)
+        self._variants = ImageVariantWorker(self._images, self._writer, self.variants_ready.emit)
+        self._faceit_cache = FaceitResponseCache(os.path.join(self.app_dir, "faceit_cache"))
+        self._tournament_stats_store = FaceitTournamentStatsStore(
+            os.path.join(self._faceit_cache.cache_dir, "tournament_stats.json")
+        )
 
         self.maps: Dict[str, Asset] = {}
 
+        # FACEIT-tilastot viedään taustasäikeessä (ks. _schedule_statistics_export).
+        self._stats_lock = threading.Lock()
+        self._stats_pending: Optional[dict] = None
+        self._stats_worker_running = False
+
+        # Standings/Bracket-muokkaukset tulevat ryöppyinä (kirjoitus, spinboxit) -> yhdistetään, viedään vain se osio.
+        self._pending_sections: set = set()
+        self._section_update_timer = QTimer(self)
+        self._section_update_timer.setSingleShot(True)
+        self._section_update_timer.setInterval(150)
+        self._section_update_timer.timeout.connect(self._flush_section_updates)
+
+        self._exporters: List[tuple] = []
+        self._register_exporters()
+
         self._build_menubar()
 
         central = QWidget(); self.setCentralWidget(central)
@@ -2454,12 +3094,12 @@ class TournamentApp(QMainWindow):
         
         # --- STANDINGS TAB ---
         self.standings_tab = StandingsTab()
-        self.standings_tab.updated.connect(self._update)
+        self.standings_tab.updated.connect(lambda: self._schedule_section_update("standings"))
         tabs.addTab(self.standings_tab, "Standings")
 
         # --- BRACKET TAB ---
         self.bracket_tab = BracketTab()
-        self.bracket_tab.updated.connect(self._update)
+        self.bracket_tab.updated.connect(lambda: self._schedule_section_update("bracket"))
         self.bracket_tab.set_qualified_provider(self._teams_from_standings)
         tabs.addTab(self.bracket_tab, "Bracket")
         
@@ -2563,12 +3203,9 @@ class TournamentApp(QMainWindow):
             import urllib.request, urllib.error, json
             for match_id in match_ids:
                 try:
-                    req = urllib.request.Request(
-                        f"https://open.faceit.com/data/v4/matches/{match_id}",
-                        headers={"Authorization": f"Bearer {api_key}"},
+                    data = self._faceit_get_json(
+                        f"https://open.faceit.com/data/v4/matches/{match_id}", api_key, timeout=6.0
                     )
-                    with urllib.request.urlopen(req, timeout=6.0) as resp:
-                        data = json.loads(resp.read().decode("utf-8", errors="ignore"))
 
                     rounds = data.get("rounds") or []
                     names = [self._normalize_map_name(str((r.get("round_stats") or {}).get("Map") or "")) for r in rounds]
@@ -2866,16 +3503,8 @@ class TournamentApp(QMainWindow):
         import urllib.request, urllib.error, json
 
         for match_id in match_ids:
-            headers = {}
-            if api_key:
-                headers["Authorization"] = f"Bearer {api_key}"
             try:
-                req = urllib.request.Request(
-                    f"https://open.faceit.com/data/v4/matches/{match_id}",
-                    headers=headers,
-                )
-                with urllib.request.urlopen(req, timeout=8.0) as resp:
-                    data = json.loads(resp.read().decode("utf-8", errors="ignore"))
+                data = self._faceit_get_json(f"https://open.faceit.com/data/v4/matches/{match_id}", api_key)
 
                 teams = data.get("teams") or {}
                 team_map = self._build_faceit_team_key_map(teams)
@@ -3053,12 +3682,7 @@ class TournamentApp(QMainWindow):
         team_details = None
         for match_id in match_ids:
             try:
-                req = urllib.request.Request(
-                    f"https://open.faceit.com/data/v4/matches/{match_id}",
-                    headers={"Authorization": f"Bearer {api_key}"},
-                )
-                with urllib.request.urlopen(req, timeout=8.0) as resp:
-                    data = json.loads(resp.read().decode("utf-8", errors="ignore"))
+                data = self._faceit_get_json(f"https://open.faceit.com/data/v4/matches/{match_id}", api_key)
                 players_by_slot = self._extract_faceit_playing_players(data)
                 team_details = self._extract_faceit_team_details(data)
                 if players_by_slot:
@@ -3154,6 +3778,26 @@ class TournamentApp(QMainWindow):
         self._update()
         QMessageBox.information(self, "FACEIT import", f"Imported {min(len(draft_maps), len(self.map_rows))} maps from FACEIT.")
 
+    def _faceit_get_json(self, url: str, api_key: str = "", *, timeout: float = 8.0, permanent: bool = False):
+        """FACEIT Data API -GET levyvälimuistin kautta (ks. FaceitResponseCache)."""
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        return self._faceit_cache.get_json(url, headers, timeout=timeout, permanent=permanent)
+
+    def _faceit_get_json_many(self, urls: List[str], api_key: str = "", *, permanent: bool = False) -> Dict[str, Optional[object]]:
+        """Hae useita FACEIT-URL:eja rinnakkain; epäonnistunut haku -> None."""
+        def fetch(url: str):
+            try:
+                return self._faceit_get_json(url, api_key, permanent=permanent)
+            except Exception:
+                return None
+
+        unique = list(dict.fromkeys(u for u in urls if u))
+        if len(unique) <= 1:
+            return {u: fetch(u) for u in unique}
+        workers = min(self._faceit_cache.max_concurrency, len(unique))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="faceit") as pool:
+            return dict(zip(unique, pool.map(fetch, unique)))
+
     def _parse_faceit_stat_number(self, value):
         if value is None:
             return None
@@ -3323,26 +3967,19 @@ class TournamentApp(QMainWindow):
         match_ids = self._extract_faceit_match_ids(match_page)
         if not match_ids or not api_key:
             return None
-        import urllib.request
-        import urllib.error
-        import json
+        stats_urls = {mid: f"https://open.faceit.com/data/v4/matches/{mid}/stats" for mid in match_ids}
+        responses = self._faceit_get_json_many(list(stats_urls.values()), api_key)
         for match_id in match_ids:
-            try:
-                req = urllib.request.Request(
-                    f"https://open.faceit.com/data/v4/matches/{match_id}/stats",
-                    headers={"Authorization": f"Bearer {api_key}"},
-                )
-                with urllib.request.urlopen(req, timeout=8.0) as resp:
-                    data = json.loads(resp.read().decode("utf-8", errors="ignore"))
-                if isinstance(data, dict):
-                    parsed = self._extract_faceit_match_statistics(data, selected_maps)
-                    if parsed.get("players"):
-                        parsed["match_id"] = match_id
-                        return parsed
-            except urllib.error.HTTPError:
+            data = responses.get(stats_urls[match_id])
+            if not isinstance(data, dict):
                 continue
+            try:
+                parsed = self._extract_faceit_match_statistics(data, selected_maps)
             except Exception:
                 continue
+            if parsed.get("players"):
+                parsed["match_id"] = match_id
+                return parsed
         return None
 
     def _extract_faceit_championship_ids(self, source_url: str) -> List[str]:
@@ -3387,71 +4024,70 @@ class TournamentApp(QMainWindow):
             out.append(mid)
         return out
 
-    def _fetch_faceit_tournament_match_ids(self, urls: List[str], api_key: str) -> List[str]:
-        import urllib.request
-        import urllib.error
-        import json
+    def _fetch_faceit_tournament_match_ids(self, urls: List[str], api_key: str) -> Tuple[List[str], set]:
+        """
+        Palauttaa (kaikki ottelu-ID:t järjestyksessä, turnausten type=past-listauksista tulleet ID:t).
+        Vain jälkimmäiset ovat varmasti valmiita; HTML-sivuilta poimitut voivat olla vielä käynnissä.
+        """
+        def championship_match_ids(championship_id: str) -> List[str]:
+            # Sivut haetaan järjestyksessä: seuraavan sivun tarve selviää vasta edellisestä.
+            ids: List[str] = []
+            offset = 0
+            while True:
+                try:
+                    data = self._faceit_get_json(
+                        f"https://open.faceit.com/data/v4/championships/{championship_id}/matches?type=past&limit=100&offset={offset}",
+                        api_key,
+                    )
+                except Exception:
+                    break
 
-        out: List[str] = []
-        seen = set()
+                items = []
+                if isinstance(data, dict):
+                    items = data.get("items") or data.get("matches") or []
 
-        for raw_url in urls:
-            url = (raw_url or "").strip()
-            if not url:
-                continue
+                page_match_ids: List[str] = []
+                for item in items:
+                    if not isinstance(item, dict):
+                        continue
+                    match_id = (item.get("match_id") or item.get("id") or "").strip()
+                    if match_id:
+                        page_match_ids.append(match_id)
 
-            championship_ids = self._extract_faceit_championship_ids(url)
-            for championship_id in championship_ids:
-                offset = 0
-                while True:
-                    page_match_ids: List[str] = []
-                    try:
-                        req = urllib.request.Request(
-                            f"https://open.faceit.com/data/v4/championships/{championship_id}/matches?type=past&limit=100&offset={offset}",
-                            headers={"Authorization": f"Bearer {api_key}"},
-                        )
-                        with urllib.request.urlopen(req, timeout=8.0) as resp:
-                            data = json.loads(resp.read().decode("utf-8", errors="ignore"))
-
-                        items = []
-                        if isinstance(data, dict):
-                            items = data.get("items") or data.get("matches") or []
-
-                        for item in items:
-                            if not isinstance(item, dict):
-                                continue
-                            match_id = (item.get("match_id") or item.get("id") or "").strip()
-                            if match_id:
-                                page_match_ids.append(match_id)
-
-                        if not page_match_ids:
-                            break
-
-                        for mid in page_match_ids:
-                            low = mid.lower()
-                            if low in seen:
-                                continue
-                            seen.add(low)
-                            out.append(mid)
-
-                        if len(page_match_ids) < 100:
-                            break
-                        offset += 100
-                    except urllib.error.HTTPError:
-                        break
-                    except Exception:
-                        break
+                ids.extend(page_match_ids)
+                if len(page_match_ids) < 100:
+                    break
+                offset += 100
+            return ids
 
-            for mid in self._extract_faceit_match_ids_from_html(url):
-                low = mid.lower()
-                if low in seen:
+        # Turnaukset ja HTML-sivut haetaan rinnakkain, tulokset yhdistetään alkuperäisessä järjestyksessä.
+        out: List[str] = []
+        past = set()
+        seen = set()
+        with ThreadPoolExecutor(max_workers=self._faceit_cache.max_concurrency, thread_name_prefix="faceit") as pool:
+            jobs = []
+            for raw_url in urls:
+                url = (raw_url or "").strip()
+                if not url:
                     continue
-                seen.add(low)
-                out.append(mid)
+                for championship_id in self._extract_faceit_championship_ids(url):
+                    jobs.append((True, pool.submit(championship_match_ids, championship_id)))
+                jobs.append((False, pool.submit(self._extract_faceit_match_ids_from_html, url)))
+
+            for from_past, job in jobs:
+                for mid in job.result():
+                    if from_past:
+                        past.add(mid)
+                    low = mid.lower()
+                    if low in seen:
+                        continue
+                    seen.add(low)
+                    out.append(mid)
 
-        return out
+        return out, past
 
-    def _extract_faceit_team_statistics_from_match(self, api_data: dict, team_keys: Dict[str, set]) -> Dict[str, dict]:
+    def _extract_faceit_match_team_stats(self, api_data: dict) -> List[dict]:
+        """Ottelun tilastot joukkueittain (kierrokset yhdistettynä), riippumatta siitä mitkä joukkueet GUI:ssa ovat."""
         rounds = api_data.get("rounds") or []
 
         def stat_value(stats: dict, *aliases: str):
@@ -3474,28 +4110,18 @@ class TournamentApp(QMainWindow):
                     return value
             return None
 
-        result = {
-            "team1": {"players": {}, "name": ""},
-            "team2": {"players": {}, "name": ""},
-        }
+        teams: Dict[str, dict] = {}
 
         for rnd in rounds:
             for team in (rnd.get("teams") or []):
                 team_stats = team.get("team_stats") or {}
                 team_id = (team.get("team_id") or team.get("faction_id") or "").strip()
                 team_name = str(team_stats.get("Team") or team.get("name") or "").strip()
-                team_name_key = self._normalize_team_name_key(team_name)
-
-                slot = ""
-                for slot_name in ("team1", "team2"):
-                    slot_keys = team_keys.get(slot_name) or set()
-                    if (team_id and team_id.lower() in slot_keys) or (team_name_key and team_name_key in slot_keys):
-                        slot = slot_name
-                        break
-                if not slot:
+                team_key = team_id.lower() or self._normalize_team_name_key(team_name)
+                if not team_key:
                     continue
 
-                slot_obj = result[slot]
+                slot_obj = teams.setdefault(team_key, {"team_id": team_id, "name": "", "players": {}})
                 if team_name and not slot_obj["name"]:
                     slot_obj["name"] = team_name
 
@@ -3546,7 +4172,49 @@ class TournamentApp(QMainWindow):
                     if isinstance(kd_val, (int, float)):
                         acc["kd_values"].append(float(kd_val))
 
-        return result
+        return list(teams.values())
+
+    def _fold_faceit_team_stats(self, combined: dict, teams: List[dict], team_keys: Dict[str, set]) -> bool:
+        """Lisää yhden ottelun joukkuetilastot juoksevaan summaan; True jos jompikumpi GUI-joukkue löytyi."""
+        match_used = False
+        for team in teams:
+            team_id = (team.get("team_id") or "").lower()
+            team_name_key = self._normalize_team_name_key(team.get("name") or "")
+            slot = ""
+            for slot_name in ("team1", "team2"):
+                slot_keys = team_keys.get(slot_name) or set()
+                if (team_id and team_id in slot_keys) or (team_name_key and team_name_key in slot_keys):
+                    slot = slot_name
+                    break
+            if not slot:
+                continue
+
+            dst = combined[slot]
+            if team.get("name") and not dst.get("name"):
+                dst["name"] = team.get("name")
+            for pid, acc in (team.get("players") or {}).items():
+                match_used = True
+                if pid not in dst["players"]:
+                    dst["players"][pid] = {
+                        "nickname": acc.get("nickname") or "-",
+                        "kills": 0,
+                        "deaths": 0,
+                        "adr_sum": 0.0,
+                        "adr_count": 0,
+                        "hs_num": 0.0,
+                        "hs_den": 0.0,
+                        "kd_values": [],
+                    }
+                d = dst["players"][pid]
+                d["nickname"] = acc.get("nickname") or d["nickname"]
+                d["kills"] += int(acc.get("kills") or 0)
+                d["deaths"] += int(acc.get("deaths") or 0)
+                d["adr_sum"] += float(acc.get("adr_sum") or 0.0)
+                d["adr_count"] += int(acc.get("adr_count") or 0)
+                d["hs_num"] += float(acc.get("hs_num") or 0.0)
+                d["hs_den"] += float(acc.get("hs_den") or 0.0)
+                d["kd_values"].extend([float(v) for v in (acc.get("kd_values") or []) if isinstance(v, (int, float))])
+        return match_used
 
     def _fetch_faceit_tournament_statistics_payload(self, state: dict, api_key: str, t_faceit: dict) -> Optional[dict]:
         if not api_key:
@@ -3556,14 +4224,17 @@ class TournamentApp(QMainWindow):
             (t_faceit.get("group_stage") or "").strip(),
             (t_faceit.get("playoffs") or "").strip(),
         ]
-        match_ids = self._fetch_faceit_tournament_match_ids(t_urls, api_key)
+        match_ids, past_ids = self._fetch_faceit_tournament_match_ids(t_urls, api_key)
         if not match_ids:
             return None
 
-        t1_ids = set(self._extract_faceit_team_ids(self.team1_panel.team_faceit_link.text()))
-        t2_ids = set(self._extract_faceit_team_ids(self.team2_panel.team_faceit_link.text()))
-        t1_name_key = self._normalize_team_name_key(self.team1_panel.team_name.text())
-        t2_name_key = self._normalize_team_name_key(self.team2_panel.team_name.text())
+        # Joukkueet luetaan statesta (ei widgeteistä): tätä ajetaan tilastojen taustasäikeessä.
+        state_t1 = (state.get("team1") or {}) if isinstance(state, dict) else {}
+        state_t2 = (state.get("team2") or {}) if isinstance(state, dict) else {}
+        t1_ids = set(self._extract_faceit_team_ids(state_t1.get("faceit_link") or ""))
+        t2_ids = set(self._extract_faceit_team_ids(state_t2.get("faceit_link") or ""))
+        t1_name_key = self._normalize_team_name_key(state_t1.get("name") or "")
+        t2_name_key = self._normalize_team_name_key(state_t2.get("name") or "")
         if t1_name_key:
             t1_ids.add(t1_name_key)
         if t2_name_key:
@@ -3577,65 +4248,57 @@ class TournamentApp(QMainWindow):
             "team2": {x.lower() for x in t2_ids if x},
         }
 
-        import urllib.request
-        import urllib.error
-        import json
-
-        combined = {
-            "team1": {"players": {}, "name": self.team1_panel.team_name.text().strip()},
-            "team2": {"players": {}, "name": self.team2_panel.team_name.text().strip()},
-            "match_ids": [],
-        }
-
-        for match_id in match_ids:
-            try:
-                req = urllib.request.Request(
-                    f"https://open.faceit.com/data/v4/matches/{match_id}/stats",
-                    headers={"Authorization": f"Bearer {api_key}"},
-                )
-                with urllib.request.urlopen(req, timeout=8.0) as resp:
-                    data = json.loads(resp.read().decode("utf-8", errors="ignore"))
-            except urllib.error.HTTPError:
-                continue
-            except Exception:
-                continue
-
-            if not isinstance(data, dict):
-                continue
-
-            extracted = self._extract_faceit_team_statistics_from_match(data, team_keys)
-            match_used = False
-
-            for slot in ("team1", "team2"):
-                src = extracted[slot]
-                dst = combined[slot]
-                if src.get("name") and not dst.get("name"):
-                    dst["name"] = src.get("name")
-                for pid, acc in (src.get("players") or {}).items():
-                    match_used = True
-                    if pid not in dst["players"]:
-                        dst["players"][pid] = {
-                            "nickname": acc.get("nickname") or "-",
-                            "kills": 0,
-                            "deaths": 0,
-                            "adr_sum": 0.0,
-                            "adr_count": 0,
-                            "hs_num": 0.0,
-                            "hs_den": 0.0,
-                            "kd_values": [],
-                        }
-                    d = dst["players"][pid]
-                    d["nickname"] = acc.get("nickname") or d["nickname"]
-                    d["kills"] += int(acc.get("kills") or 0)
-                    d["deaths"] += int(acc.get("deaths") or 0)
-                    d["adr_sum"] += float(acc.get("adr_sum") or 0.0)
-                    d["adr_count"] += int(acc.get("adr_count") or 0)
-                    d["hs_num"] += float(acc.get("hs_num") or 0.0)
-                    d["hs_den"] += float(acc.get("hs_den") or 0.0)
-                    d["kd_values"].extend([float(v) for v in (acc.get("kd_values") or []) if isinstance(v, (int, float))])
-
-            if match_used:
-                combined["match_ids"].append(match_id)
+        # Juokseva summa joukkueparikohtaisesti: vain uudet valmiit ottelut lisätään siihen.
+        store = self._tournament_stats_store
+        agg_key = json.dumps({slot: sorted(keys) for slot, keys in team_keys.items()}, sort_keys=True)
+        agg = store.aggregate(agg_key)
+        if agg is None or not set(agg["folded"]) <= set(match_ids):
+            # Ensimmäinen kerta tai ottelu poistui listauksesta -> kootaan alusta (puretut ottelut tallessa).
+            agg = {
+                "folded": [],
+                "combined": {
+                    "team1": {"players": {}, "name": (state_t1.get("name") or "").strip()},
+                    "team2": {"players": {}, "name": (state_t2.get("name") or "").strip()},
+                    "match_ids": [],
+                },
+            }
+        combined = agg["combined"]
+        folded = set(agg["folded"])
+        new_ids = [mid for mid in match_ids if mid in past_ids and mid not in folded]
+        live_ids = [mid for mid in match_ids if mid not in past_ids and mid not in folded]
+
+        if new_ids:
+            # type=past-listauksen ottelut ovat valmiita: tilastot eivät enää muutu -> pysyvästi talteen.
+            missing = [mid for mid in new_ids if store.match_teams(mid) is None]
+            stats_urls = {mid: f"https://open.faceit.com/data/v4/matches/{mid}/stats" for mid in missing}
+            responses = self._faceit_get_json_many(list(stats_urls.values()), api_key, permanent=True)
+            for match_id in missing:
+                data = responses.get(stats_urls[match_id])
+                if isinstance(data, dict):
+                    store.put_match(match_id, self._extract_faceit_match_team_stats(data))
+
+            for match_id in new_ids:
+                teams = store.match_teams(match_id)
+                if teams is None:
+                    continue  # haku epäonnistui -> yritetään uudelleen seuraavalla kerralla
+                if self._fold_faceit_team_stats(combined, teams, team_keys):
+                    combined["match_ids"].append(match_id)
+                agg["folded"].append(match_id)
+
+            store.put_aggregate(agg_key, agg)
+            store.save()
+
+        if live_ids:
+            # Muut (HTML-sivuilta poimitut) voivat olla kesken: ETag-revalidointi, eikä juoksevaan summaan.
+            combined = copy.deepcopy(combined)
+            stats_urls = {mid: f"https://open.faceit.com/data/v4/matches/{mid}/stats" for mid in live_ids}
+            responses = self._faceit_get_json_many(list(stats_urls.values()), api_key)
+            for match_id in live_ids:
+                data = responses.get(stats_urls[match_id])
+                if not isinstance(data, dict):
+                    continue
+                if self._fold_faceit_team_stats(combined, self._extract_faceit_match_team_stats(data), team_keys):
+                    combined["match_ids"].append(match_id)
 
         def _to_rows(raw_players: dict) -> List[dict]:
             rows = []
@@ -3739,7 +4402,7 @@ class TournamentApp(QMainWindow):
             "team1": {"name": t1_name, "players": team1_rows},
             "team2": {"name": t2_name, "players": team2_rows},
             "players": [*team1_rows, *team2_rows],
-            "match_ids": combined["match_ids"],
+            "match_ids": list(combined["match_ids"]),
         }
 
     # ---------------------
@@ -3802,7 +4465,6 @@ class TournamentApp(QMainWindow):
     def _export_waiting(self, state: dict):
         root = self._scoreboard_root()
         wdir = os.path.join(root, "Waiting")
-        os.makedirs(wdir, exist_ok=True)
 
         w: dict = state.get("waiting") or {}
         ws = WaitingSettings(**w) if isinstance(w, dict) else WaitingSettings()
@@ -3820,11 +4482,9 @@ class TournamentApp(QMainWindow):
             "1" if use_override else "0"
         )
         
-        import json as _json
         soc = getattr(ws, "socials", {}) or {}
         try:
-            with open(os.path.join(wdir, "socials.json"), "w", encoding="utf-8") as f:
-                _json.dump(soc, f, ensure_ascii=False)
+            self._write_txt(os.path.join(wdir, "socials.json"), json.dumps(soc, ensure_ascii=False))
         except Exception:
             pass
 
@@ -3846,6 +4506,8 @@ class TournamentApp(QMainWindow):
         self._write_txt(os.path.join(wdir, "videos_dir.txt"), (src_dir or "").replace("\\", "/"))
         self._write_txt(os.path.join(wdir, "timer_running.txt"),
                 "1" if bool(ws.timer_running) else "0")
+        self._write_txt(os.path.join(wdir, "timer_ends_at.txt"),
+                str(int(round((ws.timer_ends_at or 0.0) * 1000)) if ws.timer_running else 0))
 
     def _normalize_logo_path(self, path: Optional[str]) -> Optional[str]:
         if not path:
@@ -3864,10 +4526,49 @@ class TournamentApp(QMainWindow):
             pass
         return p.replace("\\", "/")
 
+    def _bracket_logo_thumb(self, logo_path: Optional[str], out_dir: str, root: str,
+                            thumbs: Optional[set] = None) -> Optional[str]:
+        """Pyydä logosta bracket-kokoinen versio; palauttaa polun ("Scoreboard/...") kun se on valmis."""
+        src = (logo_path or "").strip()
+        if not src:
+            return None
+        if not os.path.isabs(src):
+            src = os.path.join(root, src)
+        key = hashlib.sha1(os.path.abspath(src).encode("utf-8")).hexdigest()[:16]
+        dst = os.path.join(out_dir, "logos", f"{key}-thumb.png")
+        self._variants.submit(src, dst, "thumb", "bracket")
+        if thumbs is not None:
+            thumbs.add(os.path.basename(dst))
+        tok = self._variants.revision(dst)
+        return f"{_norm_rel(dst, os.path.dirname(root))}?v={tok}" if tok else None
+
+    def _prune_bracket_thumbs(self, logos_dir: str, keep: set):
+        """Poista Bracket/logos/-kansiosta pikkukuvat, joihin bracket.json ei enää viittaa."""
+        try:
+            names = os.listdir(logos_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith("-thumb.png") and name not in keep:
+                try:
+                    os.remove(os.path.join(logos_dir, name))
+                except OSError as e:
+                    print(f"[bracket] could not remove {name}: {e}")
+
+    def _on_variants_ready(self, tags):
+        """GUI-säikeessä: uudet kuvaversiot -> päivitä niihin viittaavat indeksit ja ilmoita overlayille."""
+        state = getattr(self, "_last_state_for_diff", None) or {}
+        if "assets.maps" in tags:
+            self._export_assets_category("Maps", self.maps)
+        if "bracket" in tags and state.get("bracket"):
+            self._export_bracket(self._bracket_settings_from_state(state["bracket"]))
+        if tags & {"t1.logo", "t2.logo"}:
+            self._export_revisions()
+        self._notify_overlays(sorted(tags))
+
     def _export_standings(self, settings: StandingsSettings):
         root = self._scoreboard_root()
         out_dir = os.path.join(root, "Standings")
-        os.makedirs(out_dir, exist_ok=True)
 
         groups = settings.groups or []
         if not groups:
@@ -3924,11 +4625,23 @@ class TournamentApp(QMainWindow):
         if changed:
             stamp = time.strftime("%Y-%m-%d %H:%M:%S")
             self._write_txt(os.path.join(out_dir, "updated_at.txt"), stamp)
+            self._prune_bracket_thumbs(os.path.join(out_dir, "logos"), thumbs)
 
     def _export_bracket(self, settings: BracketSettings):
         root = self._scoreboard_root()
         out_dir = os.path.join(root, "Bracket")
-        os.makedirs(out_dir, exist_ok=True)
+        thumbs: set = set()   # tämän viennin pikkukuvat (myös vielä keskeneräiset)
+
+        def team_entry(team: TeamRef) -> dict:
+            entry = {
+                "name": team.name,
+                "abbr": team.abbr,
+                "logo": self._normalize_logo_path(team.logo_path),
+            }
+            thumb = self._bracket_logo_thumb(team.logo_path, out_dir, root, thumbs)
+            if thumb:
+                entry["logo_thumb"] = thumb
+            return entry
 
         rounds = []
         for r in settings.rounds or []:
@@ -3937,16 +4650,8 @@ class TournamentApp(QMainWindow):
                 matches.append({
                     "id": m.id,
                     "bo_label": m.bo_label,
-                    "team1": {
-                        "name": m.team1.name,
-                        "abbr": m.team1.abbr,
-                        "logo": self._normalize_logo_path(m.team1.logo_path),
-                    },
-                    "team2": {
-                        "name": m.team2.name,
-                        "abbr": m.team2.abbr,
-                        "logo": self._normalize_logo_path(m.team2.logo_path),
-                    },
+                    "team1": team_entry(m.team1),
+                    "team2": team_entry(m.team2),
                     "score1": int(m.score1 or 0),
                     "score2": int(m.score2 or 0),
                     "status": m.status or "",
@@ -4106,21 +4811,10 @@ class TournamentApp(QMainWindow):
     
     def _write_txt(self, path: str, text: str) -> bool:
         """
-        Kirjoittaa tiedoston vain, jos sisältö oikeasti muuttuisi.
+        Kirjoittaa tiedoston vain, jos sisältö oikeasti muuttuisi (ks. ExportWriter).
         Palauttaa True jos kirjoitettiin, False jos ohitettiin.
         """
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        new = text or ""
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                old = f.read()
-            if old == new:
-                return False
-        except FileNotFoundError:
-            pass
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(new)
-        return True
+        return self._writer.write_text(path, text or "")
 
     def _write_json(self, path: str, payload: dict) -> bool:
         body = json.dumps(payload, ensure_ascii=False, indent=2)
@@ -4276,7 +4970,6 @@ class TournamentApp(QMainWindow):
     def _export_status_text(self, state: dict):
         """Kirjoita käyttäjän asettama status-teksti Scoreboard/Match/status.txt"""
         match_dir = os.path.join(self._scoreboard_root(), "Match")
-        os.makedirs(match_dir, exist_ok=True)
         general = state.get("general", {}) or {}
         text = general.get("status_text", "").strip()
         self._write_txt(os.path.join(match_dir, "status.txt"), text)
@@ -4292,10 +4985,7 @@ class TournamentApp(QMainWindow):
     def _write_replay_pointer(self, fname: str):
         """Kirjoita viimeisin toistettava filename (vain nimi, ei polkua)."""
         replay_dir, _ = self._replay_dirs()
-        path = os.path.join(replay_dir, "replaypath.txt")
-        os.makedirs(replay_dir, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(fname.strip())
+        self._write_txt(os.path.join(replay_dir, "replaypath.txt"), fname.strip())
         self._notify_overlays(["replay"])
 
     def _next_replay_number(self, playlist_dir: str) -> int:
@@ -4371,7 +5061,7 @@ class TournamentApp(QMainWindow):
                 "t1.name","t1.score","t1.color","t1.logo","t1.abbr","t1.players",
                 "t2.name","t2.score","t2.color","t2.logo","t2.abbr","t2.players",
                 "faceit.links", "faceit.stats",
-                "general.caster1","general.caster2","general.host",
+                "general.caster1","general.caster2","general.host","general.status",
                 "waiting.texts","waiting.timer","waiting.videos","waiting.socials",
                 "maps", "standings", "bracket"
             ]
@@ -4408,7 +5098,8 @@ class TournamentApp(QMainWindow):
             keys.append("waiting.texts")
 
         if ((ow.get("timer_seconds") or 0) != (nw.get("timer_seconds") or 0) or
-            bool(ow.get("timer_running")) != bool(nw.get("timer_running"))):
+            bool(ow.get("timer_running")) != bool(nw.get("timer_running")) or
+            (ow.get("timer_ends_at") or 0) != (nw.get("timer_ends_at") or 0)):
             keys.append("waiting.timer")
 
         if (ow.get("videos_dir") or "").strip() != (nw.get("videos_dir") or "").strip():
@@ -4460,6 +5151,8 @@ class TournamentApp(QMainWindow):
             keys.append("general.caster2")
         if (go.get("host") or "").strip() != (gn.get("host") or "").strip():
             keys.append("general.host")
+        if (go.get("status_text") or "").strip() != (gn.get("status_text") or "").strip():
+            keys.append("general.status")
 
         if old.get("current_map") != new.get("current_map"):
             keys.append("maps")
@@ -4528,7 +5221,6 @@ class TournamentApp(QMainWindow):
         """
         root = self._scoreboard_root()
         out_path = os.path.join(root, "Match", "maps.txt")
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
 
         pool = state.get("map_pool") or []
         names = pool if pool else sorted(self.maps.keys())
@@ -4542,31 +5234,115 @@ class TournamentApp(QMainWindow):
         self._write_txt(names_txt, "\n".join(names) + ("\n" if names else ""))
 
 
-    def _notify_overlays(self, changed_keys: list):
-        """POST /notify -> paikallispalvelin pushaa SSE-viestin."""
+    def _overlay_values(self, state: dict, changed_keys: list) -> dict:
+        """
+        Poimi muuttuneiden avainten arvot statesta SSE-viestiin, jotta overlayt
+        voivat päivittää kentät suoraan ilman tiedostojen uudelleenlukua.
+        Avaimet, joilla ei ole yksinkertaista arvoa (logot, standings, bracket),
+        jätetään pois -> overlay lukee ne kuten ennenkin.
+        """
+        if not isinstance(state, dict):
+            return {}
+        general = state.get("general") or {}
+        waiting = state.get("waiting") or {}
+        teams = {"t1": state.get("team1") or {}, "t2": state.get("team2") or {}}
+
+        values = {}
+        for key in changed_keys or []:
+            prefix, _, field = key.partition(".")
+            if prefix in teams and teams[prefix]:
+                team = teams[prefix]
+                if field == "name":
+                    values[key] = team.get("name") or ""
+                elif field == "score":
+                    values[key] = str(team.get("score", 0))
+                elif field == "color":
+                    values[key] = team.get("color_hex") or ""
+                elif field == "abbr":
+                    values[key] = team.get("abbr") or ""
+                elif field == "players":
+                    values[key] = [
+                        {"name": (p.get("name") or "").strip(), "faceit_link": (p.get("faceit_link") or "").strip()}
+                        for p in (team.get("players") or []) if isinstance(p, dict)
+                    ]
+            elif prefix == "general" and general:
+                if field == "colors":
+                    values[key] = dict(general.get("colors") or {})
+                elif field in ("caster1", "caster2", "host"):
+                    values[key] = general.get(field) or ""
+                elif field == "status":
+                    values[key] = (general.get("status_text") or "").strip()
+            elif prefix == "waiting" and waiting:
+                if field == "texts":
+                    values[key] = {
+                        "text_starting": waiting.get("text_starting") or "",
+                        "text_brb": waiting.get("text_brb") or "",
+                        "text_end": waiting.get("text_end") or "",
+                    }
+                elif field == "timer":
+                    values[key] = {
+                        "seconds": int(waiting.get("timer_seconds") or 0),
+                        "running": bool(waiting.get("timer_running")),
+                        "ends_at": int(round(float(waiting.get("timer_ends_at") or 0) * 1000)),
+                    }
+                elif field == "socials":
+                    values[key] = dict(waiting.get("socials") or {})
+            elif key == "maps" and state.get("maps"):
+                values[key] = {
+                    "current_map": state.get("current_map"),
+                    "first_to": general.get("first_to"),
+                    "maps": list(state.get("maps") or []),
+                }
+        return values
+
+    def _open_state_segment(self, base_root: str):
+        """Jaettu state-muisti erilliselle server.py:lle; upotettu palvelin ei tarvitse sitä."""
+        if _embedded_server is not None:
+            return None
+        from server import StateSegment, state_segment_path
+        try:
+            return StateSegment.create(state_segment_path(base_root))
+        except Exception as e:
+            print(f"[server] shared state segment unavailable, posting /state instead: {e}")
+            return None
+
+    def _post_to_server(self, route: str, payload: dict):
+        """Välitä JSON paikallispalvelimelle (ks. ServerChannel); ei koskaan odota verkkoa."""
+        self._server_channel.post(route, payload)
+
+    def _publish_state(self, state: dict):
+        """POST /state -> palvelin pitää viimeisimmän staten muistissa (/state, /state/<osio>)."""
+        if not state:
+            return
+        self._post_to_server("/state", state)
+
+    def _publish_statistics(self, payload: dict):
+        """POST /statistics -> palvelin yhdistää sen stateen valmiiksi /render-dokumentiksi."""
+        if not isinstance(payload, dict):
+            return
+        self._post_to_server("/statistics", payload)
+
+    def _notify_overlays(self, changed_keys: list, values: Optional[dict] = None):
+        """POST /notify -> paikallispalvelin pushaa SSE-viestin (valinnaisesti arvoineen)."""
         if not changed_keys:
             return
-        try:
-            import urllib.request, json
-            data = json.dumps({"changed": changed_keys}).encode("utf-8")
-            req = urllib.request.Request(
-                "http://127.0.0.1:8324/notify",
-                data=data,
-                headers={"Content-Type":"application/json"}
-            )
-            urllib.request.urlopen(req, timeout=0.5).read()
-        except Exception:
-            pass
+        body = {"changed": changed_keys}
+        if values:
+            body["values"] = values
+        self._post_to_server("/notify", body)
 
     def _scoreboard_root(self):
         base = os.environ.get("SOWB_ROOT") or _app_base()
         root = os.path.join(base, "Scoreboard")
-        _ensure_scoreboard_tree(root)
-        try:
-            with open(os.path.join(root, "__last_gui_touch.txt"), "w", encoding="utf-8") as f:
-                f.write("ok")
-        except Exception:
-            pass
+        if getattr(self, "_scoreboard_root_ready", None) != root:
+            # Hakemistopuu ja touch-merkki kerran per istunto (tai kun SOWB_ROOT vaihtuu).
+            _ensure_scoreboard_tree(root)
+            try:
+                with open(os.path.join(root, "__last_gui_touch.txt"), "w", encoding="utf-8") as f:
+                    f.write("ok")
+            except Exception:
+                pass
+            self._scoreboard_root_ready = root
         return root
 
     @staticmethod
@@ -4581,18 +5357,13 @@ class TournamentApp(QMainWindow):
     def _ensure_dir(p: str):
         os.makedirs(p, exist_ok=True)
    
-    def _save_pixmap_as_png(self, src_path: Optional[str], dst_path: str, *, force: bool = False):
+    def _save_pixmap_as_png(self, src_path: Optional[str], dst_path: str):
+        """Vie kuvan PNG:nä ImageCachen kautta; kohde kirjoitetaan vain jos sisältö muuttui."""
         if not src_path:
             return
-        if not force:
-            try:
-                if os.path.exists(dst_path) and os.path.getmtime(dst_path) >= os.path.getmtime(src_path):
-                    return
-            except OSError:
-                pass
-        pix = QPixmap(src_path)
-        if not pix.isNull():
-            pix.save(dst_path, "PNG")
+        data = self._images.png_bytes(src_path)
+        if data is not None:
+            self._writer.write_bytes(dst_path, data)
 
     def _export_assets_category(self, category_name: str, assets: Dict[str, Asset]):
         """
@@ -4604,9 +5375,7 @@ class TournamentApp(QMainWindow):
         self._ensure_dir(cat_dir)
 
         index_path = os.path.join(cat_dir, "index.txt")
-        with open(index_path, "w", encoding="utf-8") as f:
-            for name in sorted(assets.keys()):
-                f.write(name + "\n")
+        self._write_txt(index_path, "".join(name + "\n" for name in sorted(assets.keys())))
 
         for name, asset in assets.items():
             slug = self._slugify(name)
@@ -4622,20 +5391,8 @@ class TournamentApp(QMainWindow):
             if not src:
                 continue
 
-            try:
-                need_copy = True
-                try:
-                    st_src = os.stat(src)
-                    st_dst = os.stat(out_png)
-                    if st_dst.st_size == st_src.st_size and int(st_dst.st_mtime) >= int(st_src.st_mtime):
-                        need_copy = False
-                except FileNotFoundError:
-                    pass
-
-                if need_copy:
-                    shutil.copy2(src, out_png)
-            except Exception as e:
-                print(f"[Maps] copy failed {src} -> {out_png}: {e}")
+            # ExportWriter: temp-tiedosto + os.replace, ja vain jos PNG-sisältö muuttui.
+            self._save_pixmap_as_png(src, out_png)
 
         if category_name == "Maps":
             items = []
@@ -4645,30 +5402,68 @@ class TournamentApp(QMainWindow):
                 img_rel = _norm_rel(out_png, root)
 
                 item = {"name": name, "slug": slug, "image": img_rel}
+                card = os.path.join(cat_dir, "variants", f"{slug}-card.png")
+                if os.path.exists(out_png):
+                    self._variants.submit(out_png, card, "card", "assets.maps")
+                revs = {}
+                tok = self._revision_token(out_png)
+                if tok:
+                    revs["image"] = tok
+                tok = self._variants.revision(card)
+                if tok:
+                    item["variants"] = {"card": _norm_rel(card, root)}
+                    revs["card"] = tok
+                if revs:
+                    item["revs"] = revs
                 items.append(item)
 
             index_json_path = os.path.join(cat_dir, "index.json")
             payload = {"maps": items}
-            with open(index_json_path, "w", encoding="utf-8") as f:
-                json.dump(payload, f, ensure_ascii=False, indent=2)
+            self._write_json(index_json_path, payload)
 
 
     def _export_general(self, settings: 'GeneralSettings'):
+        self._export_general_texts(settings)
+        self._export_general_logos(settings)
+
+    def _export_general_texts(self, settings: 'GeneralSettings'):
         root = self._scoreboard_root()
         gen_dir = os.path.join(root, "General")
-        self._ensure_dir(gen_dir)
 
         self._write_txt(os.path.join(gen_dir, "host.txt"),     settings.host or "")
         self._write_txt(os.path.join(gen_dir, "caster1.txt"),  settings.caster1 or "")
         self._write_txt(os.path.join(gen_dir, "caster2.txt"),  settings.caster2 or "")
         self._write_txt(os.path.join(gen_dir, "first_to.txt"), str(settings.first_to))
 
-        with open(os.path.join(gen_dir, "colors.txt"), "w", encoding="utf-8") as f:
-            for k, v in (settings.colors or {}).items():
-                f.write(f"{k}={v}\n")
+        self._write_txt(os.path.join(gen_dir, "colors.txt"),
+                        "".join(f"{k}={v}\n" for k, v in (settings.colors or {}).items()))
 
-        self._save_pixmap_as_png(settings.overlay_logo_path,    os.path.join(gen_dir, "OverlayLogo.png"),    force=True)
-        self._save_pixmap_as_png(settings.transition_logo_path, os.path.join(gen_dir, "TransitionLogo.png"), force=True)
+    def _export_general_logos(self, settings: 'GeneralSettings'):
+        gen_dir = os.path.join(self._scoreboard_root(), "General")
+        self._ensure_dir(gen_dir)
+        self._save_pixmap_as_png(settings.overlay_logo_path,    os.path.join(gen_dir, "OverlayLogo.png"))
+        self._save_pixmap_as_png(settings.transition_logo_path, os.path.join(gen_dir, "TransitionLogo.png"))
+
+    def _revision_token(self, path: str) -> Optional[str]:
+        """Lyhyt sisältötunniste (sha1-alku) tai None jos tiedostoa ei ole."""
+        digest = self._writer.digest(path)
+        return digest[:12] if digest else None
+
+    def _export_revisions(self) -> dict:
+        """
+        Scoreboard/revisions.json: logojen sisältötunnisteet (null = tiedostoa ei ole).
+        Overlayt hakevat kuvan muodossa <polku>?v=<tunniste>; palvelin antaa tällaisille pitkän välimuistin,
+        joten logo ladataan vain kun sen sisältö oikeasti muuttuu.
+        Kuvaversioiden tunnisteet tulevat ImageVariantWorkerilta (null kun kesken, overlay käyttää
+        silloin alkuperäistä); _on_variants_ready ajaa tämän uudelleen, kun versio on kirjoitettu.
+        """
+        root = self._scoreboard_root()
+        files = {rel: self._revision_token(os.path.join(root, *rel.split("/"))) for rel in REVISIONED_IMAGES}
+        for rel in REVISIONED_VARIANTS:
+            files[rel] = self._variants.revision(os.path.join(root, *rel.split("/")))
+        if self._write_json(os.path.join(root, "revisions.json"), {"files": files}):
+            self._publish_state({"revisions": files})
+        return files
 
     def _export_scoreboard(self, state: dict):
         self._export_assets_category("Maps", self.maps)
@@ -4680,30 +5475,50 @@ class TournamentApp(QMainWindow):
         self._export_waiting(state)
     
     def _export_match(self, state: dict):
-        root = self._scoreboard_root()
-        match_dir = os.path.join(root, "Match")
-        self._ensure_dir(match_dir)
-
-        def write_team_flat(prefix: str, team: dict):
-            self._write_txt(os.path.join(match_dir, f"{prefix}Name.txt"),  team.get("name", "") or "")
-            self._write_txt(os.path.join(match_dir, f"{prefix}Score.txt"), str(team.get("score", 0)))
-            self._write_txt(os.path.join(match_dir, f"{prefix}Color.txt"), team.get("color_hex", "") or "")
-            self._write_txt(os.path.join(match_dir, f"{prefix}Abbr.txt"),  team.get("abbr", "") or "")
-
+        for slot in ("team1", "team2"):
+            for field in ("name", "score", "color_hex", "abbr", "players", "logo_path"):
+                self._export_team_field(state, slot, field)
+        self._export_faceit_config(state)
+        self._export_map_files(state)
+        self._export_match_text(state)
+        self._export_match_json(state)
+
+    def _match_dir(self) -> str:
+        return os.path.join(self._scoreboard_root(), "Match")
+
+    def _export_team_field(self, state: dict, slot: str, field: str):
+        """Vie yhden joukkuekentän tiedostot (esim. team1.score -> T1Score.txt)."""
+        match_dir = self._match_dir()
+        prefix = "T1" if slot == "team1" else "T2"
+        team = state.get(slot) or {}
+
+        if field == "players":
+            players = team.get("players") or []
             lines = []
-            for i, p in enumerate(team.get("players") or [], start=1):
+            for i, p in enumerate(players, start=1):
                 name = (p.get("name") or "").replace("\t", " ")
                 faceit = (p.get("faceit_link") or "").replace("\t", " ")
                 lines.append(f"{i}\t{name}\t{faceit}")
             self._write_txt(os.path.join(match_dir, f"{prefix}Players.txt"), "\n".join(lines) + ("\n" if lines else ""))
+            for i in range(PLAYER_SLOTS):
+                p = players[i] if i < len(players) else {}
+                self._write_txt(os.path.join(match_dir, f"{prefix}P{i+1}Name.txt"), (p.get("name") or "").strip())
+                self._write_txt(os.path.join(match_dir, f"{prefix}P{i+1}Faceit.txt"), (p.get("faceit_link") or "").strip())
+        elif field == "logo_path":
+            src = team.get("logo_path")
+            self._save_pixmap_as_png(src, os.path.join(match_dir, f"{prefix}Logo.png"))
+            # Overlayt näyttävät logon enintään ~300 px -> lisäksi logo-kokoinen versio taustasäikeessä.
+            if src:
+                tag = "t1.logo" if slot == "team1" else "t2.logo"
+                self._variants.submit(src, os.path.join(match_dir, "variants", f"{prefix}Logo-logo.png"), "logo", tag)
+        elif field == "score":
+            self._write_txt(os.path.join(match_dir, f"{prefix}Score.txt"), str(team.get("score", 0)))
+        else:
+            suffix = {"name": "Name", "color_hex": "Color", "abbr": "Abbr"}[field]
+            self._write_txt(os.path.join(match_dir, f"{prefix}{suffix}.txt"), team.get(field, "") or "")
 
-            logo_src = team.get("logo_path")
-            self._save_pixmap_as_png(logo_src, os.path.join(match_dir, f"{prefix}Logo.png"), force=True)
-
-        t1 = state.get("team1") or {}
-        t2 = state.get("team2") or {}
-        write_team_flat("T1", t1)
-        write_team_flat("T2", t2)
+    def _export_faceit_config(self, state: dict):
+        match_dir = self._match_dir()
         t_faceit = state.get("tournament_faceit", {}) or {}
         stats_cfg = state.get("statistics", {}) or {}
         self._write_txt(os.path.join(match_dir, "FaceitGroupStage.txt"), (t_faceit.get("group_stage") or "").strip())
@@ -4715,6 +5530,8 @@ class TournamentApp(QMainWindow):
         maps_txt = ",".join(str(m).strip() for m in (stats_cfg.get("match_maps") or []) if str(m).strip())
         self._write_txt(os.path.join(match_dir, "FaceitMatchMaps.txt"), maps_txt)
 
+    def _export_map_files(self, state: dict):
+        match_dir = self._match_dir()
         cur = state.get("current_map")
         self._write_txt(os.path.join(match_dir, "CurrentMap.txt"), "" if cur is None else str(cur))
 
@@ -4739,34 +5556,66 @@ class TournamentApp(QMainWindow):
                 f"Pick={(m.get('pick') or '')}\n"
             )
             self._write_txt(os.path.join(match_dir, f"Map{idx}.txt"), body)
-        self._write_txt(os.path.join(match_dir, "matchtext.txt"), self.build_match_text(state))
 
-        with open(os.path.join(match_dir, "match.json"), "w", encoding="utf-8") as f:
-            json.dump({k: v for k, v in state.items() if k != "assets"}, f, ensure_ascii=False, indent=2)
+    def _export_match_text(self, state: dict):
+        self._write_txt(os.path.join(self._match_dir(), "matchtext.txt"), self.build_match_text(state))
 
-        match_stats_path = os.path.join(match_dir, "statistics.json")
-        existing_match_stats = {}
-        try:
-            if os.path.isfile(match_stats_path):
-                with open(match_stats_path, "r", encoding="utf-8") as f:
-                    existing_match_stats = json.load(f)
-        except Exception:
-            existing_match_stats = {}
-        with open(match_stats_path, "w", encoding="utf-8") as f:
-            json.dump(self._compose_statistics_payload(state, existing_match_stats), f, ensure_ascii=False, indent=2)
-
-        t1_players = (state.get("team1") or {}).get("players") or []
-        for i in range(PLAYER_SLOTS):
-            p = t1_players[i] if i < len(t1_players) else {}
-            self._write_txt(os.path.join(match_dir, f"T1P{i+1}Name.txt"), (p.get("name") or "").strip())
-            self._write_txt(os.path.join(match_dir, f"T1P{i+1}Faceit.txt"), (p.get("faceit_link") or "").strip())
-
-        t2_players = (state.get("team2") or {}).get("players") or []
-        for i in range(PLAYER_SLOTS):
-            p = t2_players[i] if i < len(t2_players) else {}
-            self._write_txt(os.path.join(match_dir, f"T2P{i+1}Name.txt"), (p.get("name") or "").strip())
-            self._write_txt(os.path.join(match_dir, f"T2P{i+1}Faceit.txt"), (p.get("faceit_link") or "").strip())
-            
+    def _export_match_json(self, state: dict):
+        self._write_json(os.path.join(self._match_dir(), "match.json"), {k: v for k, v in state.items() if k != "assets"})
+
+    # ---------------------
+    # Diff-driven export
+    # ---------------------
+    def _register_exporters(self):
+        """
+        Kytkee viejät tilan polkuihin (esim. "team1.score").
+        _run_exporters ajaa vain ne viejät, joiden jonkin polun arvo muuttui edellisestä viennistä.
+        """
+        def general(st: dict) -> GeneralSettings:
+            g = st.get("general") or {}
+            return GeneralSettings(**g) if isinstance(g, dict) else GeneralSettings()
+
+        reg = self._register_exporter
+        reg(("assets.maps",), lambda st: self._export_assets_category("Maps", self.maps))
+        reg(("general.host", "general.caster1", "general.caster2", "general.first_to", "general.colors"),
+            lambda st: self._export_general_texts(general(st)))
+        # Logot ajetaan joka kerta (paths=None): ImageCache huomaa myös samaan polkuun vaihdetun kuvan,
+        # ja ExportWriter kirjoittaa vain jos PNG-sisältö muuttui.
+        reg(None, lambda st: self._export_general_logos(general(st)))
+        reg(("general.status_text",), self._export_status_text)
+        for slot in ("team1", "team2"):
+            for field in ("name", "score", "color_hex", "abbr", "players"):
+                reg((f"{slot}.{field}",), lambda st, slot=slot, field=field: self._export_team_field(st, slot, field))
+            reg(None, lambda st, slot=slot: self._export_team_field(st, slot, "logo_path"))
+        reg(("tournament_faceit", "statistics"), self._export_faceit_config)
+        reg(("maps", "current_map"), self._export_map_files)
+        reg(("team1.name", "team1.score", "team2.name", "team2.score", "maps"), self._export_match_text)
+        reg(MATCH_JSON_KEYS, self._export_match_json)
+        reg(("waiting",), self._export_waiting)
+        reg(("standings",), lambda st: "standings" in st and self._export_standings(
+            self._standings_settings_from_state(st.get("standings") or {})))
+        reg(("bracket",), lambda st: "bracket" in st and self._export_bracket(
+            self._bracket_settings_from_state(st.get("bracket") or {})))
+
+    def _register_exporter(self, paths, exporter: Callable[[dict], None]):
+        """paths=None: ajetaan jokaisella viennillä (viejä itse ohittaa muuttumattoman sisällön)."""
+        self._exporters.append((None if paths is None else tuple(paths), exporter))
+
+    @staticmethod
+    def _state_value(state: Optional[dict], path: str):
+        value = state
+        for part in path.split("."):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+
+    def _run_exporters(self, old: Optional[dict], new: dict):
+        with self._writer.transaction():
+            for paths, exporter in self._exporters:
+                if paths is None or old is None or \
+                   any(self._state_value(old, p) != self._state_value(new, p) for p in paths):
+                    exporter(new)
 
     # ---------------------
     # Actions: Reset & Swap
@@ -5055,7 +5904,23 @@ class TournamentApp(QMainWindow):
             self.bracket_tab.from_settings(b_settings)
 
 
-    def _compose_statistics_payload(self, state: dict, existing: Optional[dict] = None) -> dict:
+    def _statistics_source(self, state: dict) -> str:
+        stats_ui = (state.get("statistics") or {}) if isinstance(state, dict) else {}
+        return (stats_ui.get("source") or "tournament").strip().lower()
+
+    def _fetch_statistics(self, state: dict) -> Optional[dict]:
+        """Hae FACEIT-tilastot staten asetuksilla (verkkokutsut; tulos jaetaan kaikille kirjoittajille)."""
+        stats_ui = (state.get("statistics") or {}) if isinstance(state, dict) else {}
+        t_faceit = (state.get("tournament_faceit") or {}) if isinstance(state, dict) else {}
+        api_key = (t_faceit.get("api_key") or "").strip()
+
+        if self._statistics_source(state) == "match":
+            match_page = (stats_ui.get("match_page") or "").strip()
+            selected_maps = [str(m).strip() for m in (stats_ui.get("match_maps") or []) if str(m).strip()]
+            return self._fetch_faceit_match_statistics_payload(match_page, api_key, selected_maps)
+        return self._fetch_faceit_tournament_statistics_payload(state, api_key, t_faceit)
+
+    def _compose_statistics_payload(self, state: dict, existing: Optional[dict], fetched: Optional[dict]) -> dict:
         existing = existing if isinstance(existing, dict) else {}
         stats_ui = (state.get("statistics") or {}) if isinstance(state, dict) else {}
         merged = dict(existing)
@@ -5066,117 +5931,163 @@ class TournamentApp(QMainWindow):
             "match_maps": list(stats_ui.get("match_maps") or []),
         })
 
-        source = (merged.get("source") or "").strip().lower()
-        t_faceit = (state.get("tournament_faceit") or {}) if isinstance(state, dict) else {}
-        api_key = (t_faceit.get("api_key") or "").strip()
-
-        if source == "match":
-            match_page = (merged.get("match_page") or "").strip()
-            selected_maps = [str(m).strip() for m in (merged.get("match_maps") or []) if str(m).strip()]
-            fetched = self._fetch_faceit_match_statistics_payload(match_page, api_key, selected_maps)
-            if fetched:
-                for key in ("players", "team1", "team2", "maps", "match_id"):
-                    if key in fetched:
-                        merged[key] = fetched[key]
-        else:
-            fetched = self._fetch_faceit_tournament_statistics_payload(state, api_key, t_faceit)
-            if fetched:
-                for key in ("players", "team1", "team2", "match_ids"):
-                    if key in fetched:
-                        merged[key] = fetched[key]
+        if fetched:
+            if self._statistics_source(state) == "match":
+                keys = ("players", "team1", "team2", "maps", "match_id")
+            else:
+                keys = ("players", "team1", "team2", "match_ids")
+            for key in keys:
+                if key in fetched:
+                    merged[key] = fetched[key]
 
         return merged
 
+    def _export_statistics(self, state: dict):
+        """
+        Hitaat (FACEIT-verkkokutsuja sisältävät) tilastot: Match/statistics.json ja
+        <base>/statistics.json. Ajetaan taustasäikeessä, joten vain state-dictiä käytetään.
+        """
+        fetched = self._fetch_statistics(state)
+
+        def compose_into(path: str) -> dict:
+            existing = {}
+            try:
+                if os.path.isfile(path):
+                    with open(path, "r", encoding="utf-8") as f:
+                        existing = json.load(f)
+            except Exception:
+                existing = {}
+            payload = self._compose_statistics_payload(state, existing, fetched)
+            self._write_json(path, payload)
+            return payload
+
+        match_stats = compose_into(os.path.join(self._scoreboard_root(), "Match", "statistics.json"))
+        base_root = os.environ.get("SOWB_ROOT") or _app_base()
+        compose_into(os.path.join(base_root, "statistics.json"))
+        return match_stats
+
+    def _schedule_statistics_export(self, state: dict):
+        """Käynnistä tilastojen haku taustalle; jos haku on jo käynnissä, uusin state jää jonoon."""
+        with self._stats_lock:
+            self._stats_pending = state
+            if self._stats_worker_running:
+                return
+            self._stats_worker_running = True
+        threading.Thread(target=self._statistics_worker, name="StatisticsWorker", daemon=True).start()
+
+    def _statistics_worker(self):
+        """Käsittele jonossa olevat tilastopäivitykset ja ilmoita overlayille kun valmista."""
+        while True:
+            with self._stats_lock:
+                state = self._stats_pending
+                self._stats_pending = None
+                if state is None:
+                    self._stats_worker_running = False
+                    return
+            try:
+                match_stats = self._export_statistics(state)
+            except Exception as e:
+                print(f"[statistics] export failed: {e}")
+                continue
+            with self._stats_lock:
+                superseded = self._stats_pending is not None
+            if not superseded:
+                self._publish_statistics(match_stats)
+                self._notify_overlays(["faceit.stats"])
+
     def _update(self):
         state = self._collect_state()
 
         old = getattr(self, "_last_state_for_diff", None)
         changed = self._diff_for_scoreboard(old, state)
 
-        if "assets.maps" in changed:
-            self._export_assets_category("Maps", self.maps)
+        # Kaikki tämän päivityksen tiedostot kirjoitetaan kerralla ennen kuin overlayt saavat ilmoituksen.
+        base_root = os.environ.get("SOWB_ROOT") or _app_base()
+        with self._writer.transaction():
+            self._run_exporters(old, state)
+            self._write_json(os.path.join(base_root, "match.json"), {k: v for k, v in state.items() if k != "assets"})
+            self._write_json(os.path.join(base_root, "assets.json"), state.get("assets", {}))
 
-        g = state.get("general") or {}
-        settings = GeneralSettings(**g) if isinstance(g, dict) else GeneralSettings()
-        self._export_general(settings)
+        self._publish_state(state)
+        self._export_revisions()
+        self._notify_overlays(changed, self._overlay_values(state, changed))
 
-        self._export_match(state)
-        
-        self._export_waiting(state)
-        if "standings" in state:
-            s = state.get("standings") or {}
-            s_settings = StandingsSettings(
-                title=s.get("title", ""),
-                subtitle=s.get("subtitle", ""),
-                columns=s.get("columns") or {"mode": "map_diff"},
-                rows=[_standings_row_from_dict(r) for r in (s.get("rows") or [])],
-                groups=[_standings_group_from_dict(g, fallback_key=f"group_{idx}") for idx, g in enumerate(s.get("groups") or [], start=1)],
-                display_group=s.get("display_group", ""),
-            )
-            self._export_standings(s_settings)
-        if "bracket" in state:
-            b = state.get("bracket") or {}
-            rounds = []
-            for r in b.get("rounds") or []:
-                matches = []
-                for m in r.get("matches") or []:
-                    matches.append(BracketMatch(
-                        id=m.get("id", ""),
-                        bo_label=m.get("bo_label", ""),
-                        team1=TeamRef(**(m.get("team1") or {})),
-                        team2=TeamRef(**(m.get("team2") or {})),
-                        score1=int(m.get("score1", 0) or 0),
-                        score2=int(m.get("score2", 0) or 0),
-                        status=m.get("status", ""),
-                    ))
-                rounds.append(BracketRound(
-                    name=r.get("name", ""),
-                    side=r.get("side", ""),
-                    matches=matches,
+        self._autosave(state)
+        self._last_state_for_diff = state
+        self._schedule_statistics_export(state)
+
+    def _standings_settings_from_state(self, s: dict) -> StandingsSettings:
+        return StandingsSettings(
+            title=s.get("title", ""),
+            subtitle=s.get("subtitle", ""),
+            columns=s.get("columns") or {"mode": "map_diff"},
+            rows=[_standings_row_from_dict(r) for r in (s.get("rows") or [])],
+            groups=[_standings_group_from_dict(g, fallback_key=f"group_{idx}") for idx, g in enumerate(s.get("groups") or [], start=1)],
+            display_group=s.get("display_group", ""),
+        )
+
+    def _bracket_settings_from_state(self, b: dict) -> BracketSettings:
+        rounds = []
+        for r in b.get("rounds") or []:
+            matches = []
+            for m in r.get("matches") or []:
+                matches.append(BracketMatch(
+                    id=m.get("id", ""),
+                    bo_label=m.get("bo_label", ""),
+                    team1=TeamRef(**(m.get("team1") or {})),
+                    team2=TeamRef(**(m.get("team2") or {})),
+                    score1=int(m.get("score1", 0) or 0),
+                    score2=int(m.get("score2", 0) or 0),
+                    status=m.get("status", ""),
                 ))
-            b_settings = BracketSettings(
-                title=b.get("title", ""),
-                stage=b.get("stage", ""),
-                rounds=rounds,
-                double_elim_view=b.get("double_elim_view", ""),
-                teams=[TeamRef(**(t or {})) for t in (b.get("teams") or [])],
-            )
-            self._export_bracket(b_settings)
+            rounds.append(BracketRound(
+                name=r.get("name", ""),
+                side=r.get("side", ""),
+                matches=matches,
+            ))
+        return BracketSettings(
+            title=b.get("title", ""),
+            stage=b.get("stage", ""),
+            rounds=rounds,
+            double_elim_view=b.get("double_elim_view", ""),
+            teams=[TeamRef(**(t or {})) for t in (b.get("teams") or [])],
+        )
 
-        self._export_status_text(state)
-        self._notify_overlays(changed)
+    def _schedule_section_update(self, section: str):
+        """Kerää Standings/Bracket-muutokset hetken ajan ja vie vain muuttuneen osion."""
+        self._pending_sections.add(section)
+        self._section_update_timer.start()
 
-        base_root = os.environ.get("SOWB_ROOT") or _app_base()
+    def _flush_section_updates(self):
+        sections, self._pending_sections = self._pending_sections, set()
+        old = getattr(self, "_last_state_for_diff", None)
+        if old is None:
+            self._update()
+            return
 
-        match_path = os.path.join(base_root, "match.json")
-        with open(match_path, "w", encoding="utf-8") as f:
-            json.dump({k: v for k, v in state.items() if k != "assets"}, f, ensure_ascii=False, indent=2)
+        state = self._collect_state()
+        changed = [sec for sec in ("standings", "bracket")
+                   if sec in sections and (state.get(sec) or {}) != (old.get(sec) or {})]
+        if not changed:
+            return
 
-        assets_path = os.path.join(base_root, "assets.json")
-        with open(assets_path, "w", encoding="utf-8") as f:
-            json.dump(state.get("assets", {}), f, ensure_ascii=False, indent=2)
+        patch = {sec: state.get(sec) or {} for sec in changed}
+        merged = dict(old, **patch)
+        self._run_exporters(old, merged)
+        self._publish_state(patch)
+        self._notify_overlays(changed)
 
-        statistics_path = os.path.join(base_root, "statistics.json")
-        existing_stats = {}
-        try:
-            if os.path.isfile(statistics_path):
-                with open(statistics_path, "r", encoding="utf-8") as f:
-                    existing_stats = json.load(f)
-        except Exception:
-            existing_stats = {}
-        with open(statistics_path, "w", encoding="utf-8") as f:
-            json.dump(self._compose_statistics_payload(state, existing_stats), f, ensure_ascii=False, indent=2)
+        base_root = os.environ.get("SOWB_ROOT") or _app_base()
+        self._write_json(os.path.join(base_root, "match.json"), {k: v for k, v in merged.items() if k != "assets"})
 
         self._autosave(state)
-        self._last_state_for_diff = state
-        
-    def _update_general_only(self):
-        settings = self.general_tab.to_settings()
-        settings.first_to = self._count_pick_decider_maps()
-        g = asdict(settings)
-        self._export_general(GeneralSettings(**g))
-        self._export_status_text({"general": g})
-        full = {
+        self._last_state_for_diff = merged
+
+    def _partial_state_for_diff(self, old: Optional[dict], **sections) -> dict:
+        """Edellinen tila, jossa annetut osiot korvattu (tai pelkkä runko jos täyttä päivitystä ei ole vielä tehty)."""
+        if old:
+            return dict(old, **sections)
+        return dict({
             "team1": {}, "team2": {}, "maps": [],
             "current_map": None,
             "tournament_faceit": {
@@ -5190,44 +6101,45 @@ class TournamentApp(QMainWindow):
                 "source": "match" if (self.faceit_stats_source.currentText() or "").strip().lower() == "match" else "tournament",
                 "match_maps": [(cb.text() or "").strip() for cb in self.faceit_match_map_checks if cb.isChecked() and (cb.text() or "").strip()],
             },
-            "general": g,
-            "assets": {"maps":{}},
-        }
+            "assets": {"maps": {}},
+        }, **sections)
+
+    def _update_general_only(self):
+        settings = self.general_tab.to_settings()
+        settings.first_to = self._count_pick_decider_maps()
+        g = asdict(settings)
         old = getattr(self, "_last_state_for_diff", None)
+        full = self._partial_state_for_diff(old, general=g)
+        if old:
+            self._run_exporters(old, full)
+        else:
+            self._export_general(GeneralSettings(**g))
+            self._export_status_text({"general": g})
         changed = self._diff_for_scoreboard(old, full)
         self._last_state_for_diff = full
-        self._notify_overlays(changed)
+        self._publish_state({"general": g})
+        self._export_revisions()
+        self._notify_overlays(changed, self._overlay_values(full, changed))
         
     def _update_waiting_only(self):
         w = asdict(self.waiting_tab.to_settings())
-        self._export_waiting({"waiting": w})
         settings = self.general_tab.to_settings()
         settings.first_to = self._count_pick_decider_maps()
         g = asdict(settings)
-        self._export_status_text({"general": g})
-        self._autosave(self._collect_state())
-        full = {
-            "team1": {}, "team2": {}, "maps": [],
-            "current_map": None,
-            "tournament_faceit": {
-                "group_stage": (self.faceit_group_stage.text() or "").strip(),
-                "playoffs": (self.faceit_playoffs.text() or "").strip(),
-                "api_key": (self.faceit_api_key.text() or "").strip(),
-            },
-            "statistics": {
-                "title": (self.faceit_stats_title.text() or "").strip() or "Statistics",
-                "match_page": (self.faceit_match_page.text() or "").strip(),
-                "source": "match" if (self.faceit_stats_source.currentText() or "").strip().lower() == "match" else "tournament",
-                "match_maps": [(cb.text() or "").strip() for cb in self.faceit_match_map_checks if cb.isChecked() and (cb.text() or "").strip()],
-            },
-            "general": g,
-            "waiting": w,
-            "assets": {"maps":{}},
-        }
         old = getattr(self, "_last_state_for_diff", None)
+        full = self._partial_state_for_diff(old, general=g, waiting=w)
+        if old:
+            self._run_exporters(old, full)
+            if (old.get("waiting") or {}) == w:
+                self._export_waiting(full)  # "Update (Waiting)": videokansio luetaan uudelleen
+        else:
+            self._export_waiting({"waiting": w})
+            self._export_status_text({"general": g})
+        self._autosave(self._collect_state())
         changed = self._diff_for_scoreboard(old, full)
         self._last_state_for_diff = full
-        self._notify_overlays(changed)
+        self._publish_state({"general": g, "waiting": w})
+        self._notify_overlays(changed, self._overlay_values(full, changed))
 
 
     # ---------------------
@@ -5237,9 +6149,8 @@ class TournamentApp(QMainWindow):
         if state is None:
             state = self._collect_state()
         try:
-            with open(self.autosave_path, "w", encoding="utf-8") as f:
-                json.dump(state, f, ensure_ascii=False, indent=2)
-            print(f"[autosave] wrote {self.autosave_path}")
+            if self._writer.write_text(self.autosave_path, json.dumps(state, ensure_ascii=False, indent=2)):
+                print(f"[autosave] wrote {self.autosave_path}")
         except Exception as e:
             print(f"[autosave] failed: {e}")
 
@@ -5292,17 +6203,26 @@ class TournamentApp(QMainWindow):
     def closeEvent(self, event):
         self._autosave()
         super().closeEvent(event)
+# Samassa prosessissa käynnistetty palvelin (None, jos käytössä on erillinen server.py).
+_embedded_server = None
+
+
 def _start_http_server(bind="127.0.0.1", port=8324):
-    import http.server, threading, atexit
-    from server import PushHandler
+    global _embedded_server
+    import atexit
+    from server import BackgroundServer
 
     base = os.path.dirname(sys.executable) if getattr(sys, "frozen", False) else os.path.dirname(__file__)
     os.chdir(base)
 
-    httpd = http.server.ThreadingHTTPServer((bind, port), PushHandler)
-    t = threading.Thread(target=httpd.serve_forever, daemon=True)
-    t.start()
+    try:
+        httpd = BackgroundServer(bind, port, base)
+    except OSError as e:
+        # launch.py käynnistää server.py:n omana prosessinaan -> portti on jo käytössä, käytetään sitä.
+        print(f"[server] {bind}:{port} in use, using the running server ({e})")
+        return None
     atexit.register(httpd.shutdown)
+    _embedded_server = httpd
     return httpd
 
 # -----------------------------
@@ -0,0 +1,70 @@
+// Shared helpers for the overlay pages: <script src="overlay.js"></script> before the page script.
+
+// Content-hashed image URLs from Scoreboard/revisions.json: the server caches "<path>?v=<hash>"
+// for good, so an image downloads again only when its content changes. Images without a revision
+// entry (or exports without revisions.json) fall back to a HEAD probe + cache buster.
+const REVS_MAX_AGE = 250;   // ms; one revisions.json fetch serves a whole refresh
+const revsCache = {};
+
+function scoreboardPath(p){
+  const i = p.lastIndexOf("/Scoreboard/");
+  return i < 0 ? null : { sb: p.slice(0, i + 11), rel: p.slice(i + 12) };
+}
+
+function loadRevs(sb){
+  const now = Date.now(), hit = revsCache[sb];
+  if (hit && now - hit.at <= REVS_MAX_AGE) return hit.req;
+  const req = fetch(sb + "/revisions.json?_=" + now)
+    .then(r => r.ok ? r.json() : null).then(j => j?.files || null).catch(() => null);
+  revsCache[sb] = { at: now, req };
+  return req;
+}
+
+async function headExists(p){
+  try{ const r = await fetch(p + "?_=" + Date.now(), { method: "HEAD" }); return r.ok; }catch{ return false; }
+}
+
+// src (optional) swaps the lookups, e.g. scoreboard.html answers both from its /batch response:
+// { revisions: async sb => files|null, exists: async p => bool }
+async function imageUrl(p, src){
+  const loc = scoreboardPath(p);
+  if (loc) {
+    const revs = await (src?.revisions || loadRevs)(loc.sb);
+    if (revs && loc.rel in revs) return revs[loc.rel] ? `${p}?v=${revs[loc.rel]}` : "";
+  }
+  return (await (src?.exists || headExists)(p)) ? `${p}?_=${Date.now()}` : "";
+}
+
+// Team logo (team = "T1"/"T2"): the overlay-sized Match/variants/<team>Logo-logo.png once it has been
+// written (it has a revision), otherwise the full-size Match/<team>Logo.png export.
+async function teamLogoUrl(match, team, src){
+  return (await imageUrl(`${match}/variants/${team}Logo-logo.png`, src)) || imageUrl(`${match}/${team}Logo.png`, src);
+}
+
+// Refresh on matching SSE change keys (/events?topics=...); poll once a second only while /events is down.
+// Returns run(), which callers use for the initial refresh.
+function subscribeEvents(keys, refresh){
+  let busy=false, again=false, pollTimer=null;
+  const run=async()=>{
+    if(busy){ again=true; return; }
+    busy=true;
+    try{ do{ again=false; await refresh(); }while(again); }
+    catch{}
+    finally{ busy=false; }
+  };
+  const startPoll=()=>{ if(!pollTimer) pollTimer=setInterval(run, 1000); };
+  const stopPoll=()=>{ if(pollTimer){ clearInterval(pollTimer); pollTimer=null; } };
+  const wanted=k=>keys.some(p=>k===p||k.startsWith(p+"."));
+  try{
+    const es=new EventSource("/events?topics="+encodeURIComponent(keys.join(",")));
+    es.onopen=()=>{ if(pollTimer){ stopPoll(); run(); } };
+    es.onerror=()=>startPoll();
+    es.onmessage=ev=>{
+      try{
+        const d=JSON.parse(ev.data||"{}"); const ch=Array.isArray(d.changed)?d.changed:[];
+        if(ch.some(wanted)) run();
+      }catch{}
+    };
+  }catch{ startPoll(); }
+  return run;
+}
@@ -1,10 +1,9 @@
-import os, sys, json, time, argparse, http.server, threading, socketserver
-from urllib.parse import urlparse, parse_qs, unquote
-
-class SilentHTTPServer(http.server.ThreadingHTTPServer):
-    daemon_threads = True
-    def handle_error(self, request, client_address):
-        return
+import os, sys, json, mmap, stat, html, time, struct, asyncio, hashlib, argparse, tempfile, mimetypes, posixpath, threading, traceback
+from collections import OrderedDict, deque, namedtuple
+from email.utils import formatdate, parsedate_to_datetime
+from fnmatch import fnmatchcase
+from http import HTTPStatus
+from urllib.parse import urlparse, parse_qs, unquote, quote
 
 
 def _default_base():
@@ -16,113 +15,967 @@ def _default_base():
         return os.path.dirname(os.path.abspath(sys.argv[0]))
     return os.path.dirname(os.path.abspath(__file__))
 
-_event_id = 0
-_last_payload = ""
-_cv = threading.Condition()
 
-class PushHandler(http.server.SimpleHTTPRequestHandler):
-    def end_headers(self):
-        self.send_header("Cache-Control", "no-cache, no-store, must-revalidate")
-        self.send_header("Pragma", "no-cache")
-        self.send_header("Expires", "0")
-        super().end_headers()
+# Latest GUI state snapshot (TournamentApp._collect_state), kept in memory so
+# overlays can read it from /state instead of the exported files.
+# "match" is a convenience section grouping the per-match keys.
+STATE_SECTIONS = {
+    "match": ("team1", "team2", "maps", "current_map"),
+}
+_state = {}
+_state_rev = 0
+_state_bodies = {}
+_state_lock = threading.Lock()
 
-    def log_message(self, fmt, *args):
-        return
+# Composed statistics payload (the GUI's statistics.json) for /render.
+_statistics = {}
+_render_body = None
+
+
+def _update_state(patch: dict):
+    """Replace the given top-level keys of the stored state."""
+    global _state, _state_rev, _render_body
+    with _state_lock:
+        merged = dict(_state)
+        merged.update(patch)
+        _state = merged
+        _state_rev += 1
+        _state_bodies.clear()
+        _render_body = None
+
+
+def _update_statistics(payload: dict):
+    global _statistics, _render_body
+    with _state_lock:
+        _statistics = dict(payload)
+        _render_body = None
+
+
+def _render():
+    """Return (etag, body) of the merged match + statistics document, or None before any state."""
+    global _render_body
+    with _state_lock:
+        if _render_body is not None:
+            return _render_body
+        if not _state:
+            return None
+        doc = {k: v for k, v in _state.items() if k != "assets"}
+        if _statistics:
+            doc["statistics"] = _statistics
+        body = json.dumps(doc, ensure_ascii=False).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        _render_body = (etag, body)
+        return _render_body
 
-    def log_error(self, fmt, *args):
-        return
 
-    def _handle_events(self):
-        self.send_response(200)
-        self.send_header("Content-Type", "text/event-stream")
-        self.send_header("Cache-Control", "no-cache")
-        self.send_header("Connection", "keep-alive")
-        self.end_headers()
+def _state_body(section: str = ""):
+    """Return (etag, body) for the whole state or one section, or None if unknown."""
+    with _state_lock:
+        cached = _state_bodies.get(section)
+        if cached is not None:
+            return cached
+        if not section:
+            value = _state
+        elif section in STATE_SECTIONS:
+            value = {k: _state.get(k) for k in STATE_SECTIONS[section]}
+        elif section in _state:
+            value = _state[section]
+        else:
+            return None
+        body = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        _state_bodies[section] = (etag, body)
+        return etag, body
 
+
+def _load_state(body: bytes):
+    """Replace the whole stored state with an encoded snapshot (see StateSegment)."""
+    global _state, _state_rev, _render_body
+    state = json.loads(body.decode("utf-8"))
+    if not isinstance(state, dict):
+        raise ValueError("state snapshot must be an object")
+    with _state_lock:
+        _state = state
+        _state_rev += 1
+        _state_bodies.clear()
+        # The snapshot bytes are already the /state document; serve them as-is.
+        _state_bodies[""] = ('"' + hashlib.sha1(body).hexdigest() + '"', body)
+        _render_body = None
+
+
+# Shared-memory state handoff for a GUI running in another process (launch.py).
+# The GUI writes its merged state into a memory-mapped file once per update and
+# the standalone server serves /state from the mapping instead of a POST body.
+def state_segment_path(base: str) -> str:
+    """Segment file for the app folder at base; kept outside it so it is never served or committed."""
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(base)).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"csbroadcast-{key}.state")
+
+
+class StateSegment:
+    """
+    Versioned state snapshot in a memory-mapped file, one writer and many readers.
+
+    Layout: header (magic, layout version, sequence, payload length) followed by the
+    UTF-8 JSON payload. The writer makes the sequence odd while it copies the payload
+    and even again when done, so a reader that sees an odd or changed sequence around
+    its copy knows the snapshot was torn and retries.
+    """
+
+    MAGIC = b"CSst"
+    LAYOUT = 1
+    HEADER = struct.Struct("<4sIQQ")
+    HEADER_SIZE = 32
+    SEQ_OFFSET = 8
+    LENGTH_OFFSET = 16
+    DEFAULT_SIZE = 8 * 1024 * 1024
+    READ_ATTEMPTS = 50
+
+    def __init__(self, f, mm, writable: bool):
+        self._file = f
+        self._mm = mm
+        self.writable = writable
+
+    @classmethod
+    def create(cls, path: str, size: int = DEFAULT_SIZE):
+        """Open (or create) the segment for writing, emptied and with the next even sequence number."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        f = open(path, "r+b" if os.path.exists(path) else "w+b")
         try:
-            self.wfile.write(b": connected\n\n")
-            self.wfile.flush()
-        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError, OSError, Exception):
+            # The file is never shrunk or grown while mapped (Windows forbids it).
+            if os.fstat(f.fileno()).st_size < size:
+                f.truncate(size)
+            mm = mmap.mmap(f.fileno(), 0)
+        except Exception:
+            f.close()
+            raise
+        seg = cls(f, mm, True)
+        magic, layout, seq, _length = cls.HEADER.unpack_from(mm, 0)
+        if magic != cls.MAGIC or layout != cls.LAYOUT:
+            seq = 0
+        cls.HEADER.pack_into(mm, 0, cls.MAGIC, cls.LAYOUT, (seq + 2) & ~1, 0)
+        return seg
+
+    @classmethod
+    def open(cls, path: str):
+        """Map an existing segment read-only, or return None if there is none (yet)."""
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return None
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            f.close()
+            return None
+        if len(mm) < cls.HEADER_SIZE or mm[:4] != cls.MAGIC:
+            mm.close()
+            f.close()
+            return None
+        return cls(f, mm, False)
+
+    @property
+    def capacity(self) -> int:
+        return len(self._mm) - self.HEADER_SIZE
+
+    def write(self, body: bytes) -> bool:
+        """Publish a new snapshot; False if it does not fit (the caller must hand it over another way)."""
+        if len(body) > self.capacity:
+            return False
+        mm = self._mm
+        seq = struct.unpack_from("<Q", mm, self.SEQ_OFFSET)[0]
+        struct.pack_into("<Q", mm, self.SEQ_OFFSET, seq + 1)
+        mm[self.HEADER_SIZE:self.HEADER_SIZE + len(body)] = body
+        # The length belongs to the payload: update it while the sequence is still odd.
+        struct.pack_into("<Q", mm, self.LENGTH_OFFSET, len(body))
+        struct.pack_into("<Q", mm, self.SEQ_OFFSET, seq + 2)
+        return True
+
+    def read(self, known_seq: int = -1):
+        """
+        Return (seq, body) for the current snapshot, with body None if seq == known_seq
+        or nothing has been written yet. Returns None if the writer kept it busy.
+        """
+        mm = self._mm
+        for attempt in range(self.READ_ATTEMPTS):
+            seq = struct.unpack_from("<Q", mm, self.SEQ_OFFSET)[0]
+            if seq == known_seq:
+                return seq, None
+            if not seq & 1:
+                length = struct.unpack_from("<Q", mm, self.LENGTH_OFFSET)[0]
+                if length == 0 or length > self.capacity:
+                    return seq, None
+                body = mm[self.HEADER_SIZE:self.HEADER_SIZE + length]
+                if struct.unpack_from("<Q", mm, self.SEQ_OFFSET)[0] == seq:
+                    return seq, body
+            time.sleep(0 if attempt < 10 else 0.001)
+        return None
+
+    def close(self):
+        try:
+            self._mm.close()
+        finally:
+            self._file.close()
+
+
+_segment = None
+_segment_path = None
+_segment_seq = -1
+_segment_next_open = 0.0
+
+
+def _attach_state_segment(path: str):
+    """Serve /state and /render from the GUI's shared-memory segment at path (standalone server)."""
+    global _segment_path
+    _segment_path = path
+
+
+def _sync_state_segment():
+    """Load the GUI's latest snapshot if the segment's sequence moved since the last request."""
+    global _segment, _segment_seq, _segment_next_open
+    if _segment_path is None:
+        return
+    if _segment is None:
+        # The GUI creates the segment; until then check for it at most once a second.
+        now = time.monotonic()
+        if now < _segment_next_open:
             return
+        _segment_next_open = now + 1.0
+        _segment = StateSegment.open(_segment_path)
+        if _segment is None:
+            return
+    found = _segment.read(_segment_seq)
+    if found is None:
+        return
+    seq, body = found
+    if body is not None:
+        try:
+            _load_state(body)
+        except Exception as e:
+            print(f"[server] state segment: {e}")
+    _segment_seq = seq
+
+
+# /batch: files are resolved under <root>/Scoreboard; only small text files get their contents.
+BATCH_MAX_FILES = 200
+BATCH_MAX_TEXT_BYTES = 256 * 1024
+BATCH_TEXT_EXTS = {".txt", ".json", ".csv"}
+
+
+# Content-hashed asset URLs (<path>?v=<token>, see Scoreboard/revisions.json): the URL
+# changes whenever the file does, so browsers may keep the response for good.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Everything else under the root (Scoreboard state files, overlays) is revalidated
+# with its ETag on every use.
+REVALIDATE_CACHE_CONTROL = "no-cache"
+FONT_EXTS = {".ttf", ".otf", ".woff", ".woff2"}
+
+
+def _is_fingerprinted(path, etag):
+    """True when ?v= is the content token of the bytes being served (sha1 prefix, as in revisions.json)."""
+    digest = etag.strip('"')
+    return any(len(v) >= 8 and digest.startswith(v) for v in parse_qs(urlparse(path).query).get("v", ()))
+
+
+def _static_cache_control(path, etag):
+    """
+    Cache policy for a static file: fonts and URLs whose ?v= matches the file content never change,
+    the rest is revalidated. A stale or unknown token is not pinned, since tokens can lag the file.
+    """
+    if _is_fingerprinted(path, etag):
+        return IMMUTABLE_CACHE_CONTROL
+    if os.path.splitext(urlparse(path).path)[1].lower() in FONT_EXTS:
+        return IMMUTABLE_CACHE_CONTROL
+    return REVALIDATE_CACHE_CONTROL
+
+
+def _etag_matches(header, etag):
+    """If-None-Match comparison (weak, as RFC 9110 prescribes for this header)."""
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or ("W/" + etag) in tags
+
+
+# Static files are kept in memory keyed by path and checked against (mtime, size) on
+# every request, so unchanged files are served without touching their contents.
+# Files above FILE_CACHE_MAX_ENTRY (replay clips, videos) are streamed from disk.
+FILE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+FILE_CACHE_MAX_ENTRY = 4 * 1024 * 1024
+
+_FileEntry = namedtuple("_FileEntry", "sig etag last_modified body")
+_file_cache = OrderedDict()
+_file_cache_bytes = 0
+_file_cache_lock = threading.Lock()
+
+
+def _cached_file(path):
+    """Return a _FileEntry for a regular file (body is None when too large to cache), or None."""
+    global _file_cache_bytes
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    sig = (st.st_mtime_ns, st.st_size)
+    with _file_cache_lock:
+        hit = _file_cache.get(path)
+        if hit is not None and hit.sig == sig:
+            _file_cache.move_to_end(path)
+            return hit
+
+    last_modified = formatdate(st.st_mtime, usegmt=True)
+    if st.st_size > FILE_CACHE_MAX_ENTRY:
+        return _FileEntry(sig, '"%x-%x"' % sig, last_modified, None)
+    try:
+        with open(path, "rb") as f:
+            body = f.read()
+    except OSError:
+        return None
+    entry = _FileEntry(sig, '"' + hashlib.sha1(body).hexdigest() + '"', last_modified, body)
+
+    with _file_cache_lock:
+        old = _file_cache.pop(path, None)
+        if old is not None:
+            _file_cache_bytes -= len(old.body)
+        _file_cache[path] = entry
+        _file_cache_bytes += len(body)
+        while _file_cache_bytes > FILE_CACHE_MAX_BYTES and len(_file_cache) > 1:
+            _, evicted = _file_cache.popitem(last=False)
+            _file_cache_bytes -= len(evicted.body)
+    return entry
+
+# Overlays issue many small requests per refresh; HTTP/1.1 lets a browser source reuse
+# one connection for all of them. Idle connections are closed after KEEPALIVE_TIMEOUT seconds.
+KEEPALIVE_TIMEOUT = 30
+SSE_KEEPALIVE = 15.0
+MAX_HEADERS = 100
+
+
+class EventHub:
+    """
+    SSE event log. Published events are kept in a bounded ring buffer, each encoded once.
+    A subscriber remembers the last id it sent; when it wakes it gets everything after
+    that id in one message (the union of the changed keys, the latest value per key),
+    so events that land while a client is busy or reconnecting are never lost.
+    Ids are "<boot>-<n>": a Last-Event-ID from an earlier server run is not mistaken
+    for one of ours. Lives on the server's event loop.
+    """
+
+    LOG_SIZE = 256
+
+    def __init__(self):
+        self.boot = "%x" % int(time.time() * 1000)
+        self.event_id = 0
+        self._log = deque(maxlen=self.LOG_SIZE)   # (id, event, encoded message)
+        self._known = {}                          # every key ever published (ordered set)
+        self._merged = {}                         # (after_id, to_id) -> encoded message
+        self._changed = None
+
+    def _encode(self, event_id, event):
+        data = json.dumps(event, ensure_ascii=False).encode("utf-8")
+        return b"id: %s-%d\ndata: %s\n\n" % (self.boot.encode(), event_id, data)
+
+    def publish(self, event: dict):
+        self.event_id += 1
+        self._log.append((self.event_id, event, self._encode(self.event_id, event)))
+        self._known.update(dict.fromkeys(event.get("changed", ())))
+        self._merged.clear()
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = None
+
+    async def wait(self, after_id, timeout):
+        """Wait until there is an event after after_id; False on timeout."""
+        if self.event_id != after_id:
+            return True
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def resume_point(self, last_event_id):
+        """Client's Last-Event-ID -> last id it has seen, or None if its history is gone."""
+        if not last_event_id:
+            return self.event_id
+        boot, _, n = last_event_id.strip().rpartition("-")
+        if boot == self.boot and n.isdigit() and int(n) <= self.event_id:
+            return int(n)
+        return None
+
+    def since(self, after_id, topics=None):
+        """
+        Message carrying every event after after_id (None = nothing new), limited to
+        the keys matching topics (see _parse_topics) when given.
+        """
+        if after_id is not None and after_id == self.event_id:
+            return None
+        key = (after_id, self.event_id, topics)
+        if key in self._merged:
+            return self._merged[key]
+        wanted = (lambda k: True) if topics is None else (lambda k: _topic_matches(topics, k))
+        oldest = self._log[0][0] if self._log else self.event_id + 1
+        if after_id is None or after_id < oldest - 1:
+            # Missed events are no longer in the log: announce every key seen so far.
+            changed = [k for k in self._known if wanted(k)]
+            msg = self._encode(self.event_id, {"changed": changed, "reset": True}) if changed else None
+        else:
+            pending = [entry for entry in self._log if entry[0] > after_id]
+            if len(pending) == 1 and all(wanted(k) for k in pending[0][1].get("changed", ())):
+                return pending[0][2]
+            changed, values = {}, {}
+            for _, event, _ in pending:
+                ev_values = event.get("values") or {}
+                for k in event.get("changed", ()):
+                    if not wanted(k):
+                        continue
+                    changed[k] = None
+                    if k in ev_values:
+                        values[k] = ev_values[k]
+                    else:
+                        values.pop(k, None)   # newer change without a value: read the file
+            merged = {"changed": list(changed)}
+            if values:
+                merged["values"] = values
+            msg = self._encode(self.event_id, merged) if changed else None
+        self._merged[key] = msg
+        return msg
+
+
+def _notify_event(data):
+    """/notify payload {"changed": [...], "values": {...}} -> event dict (ValueError if malformed)."""
+    if not isinstance(data, dict) or "changed" not in data:
+        raise ValueError("missing 'changed'")
+    event = {"changed": list(data["changed"])}
+    values = data.get("values")
+    if isinstance(values, dict) and values:
+        event["values"] = values
+    return event
+
+
+def _parse_topics(values):
+    """?topics=maps,t1.*,general.colors -> sorted tuple of patterns (None = everything)."""
+    topics = sorted({t.strip() for v in values or () for t in v.split(",") if t.strip()})
+    return tuple(topics) or None
+
+
+def _topic_matches(topics, key):
+    """A topic matches its key, the keys below it ("t1" -> "t1.name") and fnmatch wildcards ("t1.*")."""
+    for topic in topics:
+        if key == topic or key.startswith(topic + ".") or fnmatchcase(key, topic):
+            return True
+    return False
+
+
+_events = EventHub()
 
-        last_sent = -1
+
+class BadRequest(Exception):
+    pass
+
+
+class Request:
+    __slots__ = ("method", "target", "version", "headers", "body", "path", "query")
+
+    def __init__(self, method, target, version, headers, body):
+        self.method = method
+        self.target = target
+        self.version = version
+        self.headers = headers   # lower-case names
+        self.body = body
+        parsed = urlparse(target)
+        self.path = parsed.path
+        self.query = parse_qs(parsed.query or "")
+
+    @property
+    def keep_alive(self):
+        conn = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.1":
+            return conn != "close"
+        return conn == "keep-alive"
+
+
+async def _read_request(reader):
+    """Parse one request from the stream; None when the client closed the connection."""
+    try:
+        line = await reader.readline()
+    except ValueError:
+        raise BadRequest("Request line too long")
+    if not line:
+        return None
+    parts = line.decode("iso-8859-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        raise BadRequest(f"Bad request syntax ({line.rstrip()!r})")
+    method, target, version = parts
+
+    headers = {}
+    while True:
+        try:
+            raw = await reader.readline()
+        except ValueError:
+            raise BadRequest("Header line too long")
+        if raw in (b"\r\n", b"\n", b""):
+            break
+        name, sep, value = raw.decode("iso-8859-1").partition(":")
+        if not sep:
+            raise BadRequest("Bad header line")
+        headers[name.strip().lower()] = value.strip()
+        if len(headers) > MAX_HEADERS:
+            raise BadRequest("Too many headers")
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise BadRequest("Bad Content-Length")
+    body = await reader.readexactly(length) if length > 0 else b""
+    return Request(method.upper(), target, version, headers, body)
+
+
+def _translate_path(directory, path):
+    """URL path -> file system path under directory (same rules as SimpleHTTPRequestHandler)."""
+    trailing = path.rstrip().endswith("/")
+    path = posixpath.normpath(unquote(path, errors="surrogatepass"))
+    out = directory
+    for word in filter(None, path.split("/")):
+        if os.path.dirname(word) or word in (os.curdir, os.pardir):
+            continue
+        out = os.path.join(out, word)
+    if trailing:
+        out += "/"
+    return out
+
+
+def _guess_type(path):
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+class PushHandler:
+    """One client connection: reads requests in a loop and dispatches them by route."""
+
+    def __init__(self, reader, writer, directory):
+        self.reader = reader
+        self.writer = writer
+        self.directory = directory
+        self.request = None
+        self.close_connection = False
+        self.headers_sent = False
+
+    async def handle(self):
+        try:
+            while not self.close_connection:
+                try:
+                    self.request = await asyncio.wait_for(_read_request(self.reader), KEEPALIVE_TIMEOUT)
+                except BadRequest as e:
+                    self.request = None
+                    await self.send_error(400, str(e), close=True)
+                    break
+                if self.request is None:
+                    break
+                self.close_connection = not self.request.keep_alive
+                self.headers_sent = False
+                await self.dispatch()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass   # client went away or timed out
+        except Exception:
+            target = self.request.target if self.request is not None else "?"
+            print(f"[server] error handling {target}:\n{traceback.format_exc()}", file=sys.stderr)
+            if not self.headers_sent:
+                try:
+                    await self.send_error(500, close=True)
+                except Exception:
+                    pass
+        finally:
+            try:
+                self.writer.close()
+            except Exception:
+                pass
+
+    async def dispatch(self):
+        req = self.request
+        if req.method in ("GET", "HEAD"):
+            if req.method == "GET" and req.path == "/events":
+                return await self._handle_events()
+            if req.method == "GET" and req.path == "/external":
+                return await self._handle_external()
+            if _is_state_path(req.path):
+                return await self._handle_state_get()
+            if req.path == "/render":
+                return await self._handle_render()
+            if req.method == "GET" and req.path == "/batch":
+                return await self._handle_batch()
+            return await self._handle_static()
+        if req.method == "POST":
+            if req.path == "/notify":
+                return await self._handle_notify()
+            if _is_state_path(req.path):
+                return await self._handle_state_post(_update_state)
+            if req.path == "/statistics":
+                return await self._handle_state_post(_update_statistics)
+            if req.path == "/batch":
+                return await self._handle_batch()
+        await self.send_error(501, f"Unsupported method ({req.method!r})")
+
+    # ---- response helpers ----
+
+    def _head(self, code, headers, close=False):
+        """Status line + headers; no-store unless the caller chose a Cache-Control."""
+        try:
+            phrase = HTTPStatus(code).phrase
+        except ValueError:
+            phrase = ""
+        lines = [f"HTTP/1.1 {code} {phrase}", "Server: CSBroadcast", "Date: " + formatdate(usegmt=True)]
+        names = set()
+        for name, value in headers:
+            lines.append(f"{name}: {value}")
+            names.add(name.lower())
+        if "cache-control" not in names:
+            lines += ["Cache-Control: no-cache, no-store, must-revalidate", "Pragma: no-cache", "Expires: 0"]
+        if close:
+            self.close_connection = True
+        if self.close_connection:
+            lines.append("Connection: close")
+        self.headers_sent = True
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1", "replace")
+
+    async def send(self, code, headers=(), body=b"", close=False):
+        headers = list(headers)
+        if code not in (204, 304):
+            headers.append(("Content-Length", str(len(body))))
+        self.writer.write(self._head(code, headers, close))
+        if body and (self.request is None or self.request.method != "HEAD"):
+            self.writer.write(body)
+        await self.writer.drain()
+
+    async def send_error(self, code, message=None, close=False):
+        """Short plain-text error with Content-Length, so the connection can stay open."""
+        body = (message or HTTPStatus(code).phrase).encode("utf-8", "replace")
+        await self.send(code, [("Content-Type", "text/plain; charset=utf-8")], body, close=close)
+
+    # ---- routes ----
+
+    async def _handle_events(self):
+        last = _events.resume_point(self.request.headers.get("last-event-id"))
+        topics = _parse_topics(self.request.query.get("topics"))
+        self.writer.write(self._head(200, [
+            ("Content-Type", "text/event-stream"),
+            ("Cache-Control", "no-cache"),
+        ], close=True))   # the stream has no Content-Length; it ends with the connection
+        self.writer.write(b": connected\n\n")
+        await self.writer.drain()
         while True:
+            if last is not None and not await _events.wait(last, SSE_KEEPALIVE):
+                self.writer.write(b": keepalive\n\n")
+            else:
+                msg = _events.since(last, topics)
+                if msg is not None:
+                    self.writer.write(msg)
+                last = _events.event_id
+            await self.writer.drain()
+
+    async def _handle_notify(self):
+        try:
+            event = _notify_event(json.loads((self.request.body or b"{}").decode("utf-8")))
+        except Exception as e:
+            return await self.send_error(400, str(e))
+        _events.publish(event)
+        await self.send(204)
+
+    async def _handle_state_get(self):
+        _sync_state_segment()
+        section = self.request.path[len("/state"):].strip("/")
+        found = _state_body(section)
+        if found is None:
+            return await self.send_error(404, "Unknown state section")
+        await self._send_json_cached(*found)
+
+    async def _handle_render(self):
+        _sync_state_segment()
+        found = _render()
+        if found is None:
+            return await self.send_error(404, "No state published yet")
+        await self._send_json_cached(*found)
+
+    async def _send_json_cached(self, etag: str, body: bytes):
+        if _etag_matches(self.request.headers.get("if-none-match"), etag):
+            return await self.send(304, [("ETag", etag), ("Cache-Control", "no-cache")])
+        await self.send(200, [
+            ("Content-Type", "application/json; charset=utf-8"),
+            ("ETag", etag),
+            ("Cache-Control", "no-cache"),
+        ], body)
+
+    async def _handle_state_post(self, apply):
+        try:
+            data = json.loads((self.request.body or b"{}").decode("utf-8"))
+            if not isinstance(data, dict):
+                raise ValueError("payload must be an object")
+            apply(data)
+        except Exception as e:
+            return await self.send_error(400, str(e))
+        await self.send(204)
+
+    async def _handle_batch(self):
+        """Return many small Scoreboard files (text + existence) in one JSON response."""
+        try:
+            if self.request.method == "POST":
+                data = json.loads((self.request.body or b"{}").decode("utf-8"))
+                files = data.get("files") if isinstance(data, dict) else data
+                if not isinstance(files, list):
+                    raise ValueError("missing 'files'")
+            else:
+                files = [f for f in ",".join(self.request.query.get("files", [])).split(",") if f]
+        except Exception as e:
+            return await self.send_error(400, str(e))
+
+        root = os.path.realpath(os.path.join(self.directory, "Scoreboard"))
+        out = {}
+        for rel in files[:BATCH_MAX_FILES]:
+            rel = str(rel)
+            target = os.path.realpath(os.path.join(root, rel.lstrip("/\\")))
+            entry = {"exists": False}
+            cached = _cached_file(target) if target.startswith(root + os.sep) else None
+            if cached is not None:
+                entry["exists"] = True
+                if (os.path.splitext(target)[1].lower() in BATCH_TEXT_EXTS
+                        and cached.body is not None and len(cached.body) <= BATCH_MAX_TEXT_BYTES):
+                    text = cached.body.decode("utf-8", errors="replace")
+                    entry["text"] = text.replace("\r\n", "\n").replace("\r", "\n")
+            out[rel] = entry
+
+        body = json.dumps({"files": out}, ensure_ascii=False).encode("utf-8")
+        await self.send(200, [("Content-Type", "application/json; charset=utf-8")], body)
+
+    async def _handle_external(self):
+        raw_path = (self.request.query.get("path", [""])[0] or "").strip()
+        if not raw_path:
+            return await self.send_error(400, "Missing path")
+        target = os.path.abspath(unquote(raw_path))
+        if not os.path.isfile(target):
+            return await self.send_error(404, "File not found")
+        try:
+            f = open(target, "rb")
+        except OSError:
+            return await self.send_error(500, "Failed to read external file")
+        with f:
+            st = os.fstat(f.fileno())
+            etag = '"%x-%x"' % (st.st_mtime_ns, st.st_size)
+            await self._send_file([
+                ("Content-Type", _guess_type(target)),
+                ("ETag", etag),
+                ("Last-Modified", formatdate(st.st_mtime, usegmt=True)),
+            ], f=f, etag=etag)
+
+    async def _send_file(self, headers, f=None, body=None, etag=None, last_modified=None):
+        """
+        File contents (from memory or an open file) as 200, or 206 for a single
+        "Range: bytes=..." request. Open files go out with loop.sendfile(), which uses
+        os.sendfile / TransmitFile where available instead of copying through Python.
+        """
+        # Length from the opened file, so it matches the bytes actually sent.
+        size = len(body) if body is not None else os.fstat(f.fileno()).st_size
+        rng = self._requested_range(size, etag, last_modified)
+        if rng is False:
+            return await self.send(416, [("Content-Range", f"bytes */{size}")])
+        start, end = rng or (0, size - 1)
+        length = end - start + 1
+        headers = list(headers) + [("Accept-Ranges", "bytes"), ("Content-Length", str(length))]
+        if rng:
+            headers.append(("Content-Range", f"bytes {start}-{end}/{size}"))
+        self.writer.write(self._head(206 if rng else 200, headers))
+        if self.request.method != "HEAD" and length > 0:
+            if body is not None:
+                self.writer.write(body[start:end + 1])
+            else:
+                await self.writer.drain()
+                await asyncio.get_running_loop().sendfile(self.writer.transport, f, start, length)
+        await self.writer.drain()
+
+    def _requested_range(self, size, etag=None, last_modified=None):
+        """
+        (start, end) of a single satisfiable byte range, None to send the whole file
+        (no/unsupported Range, or If-Range no longer matching), False if unsatisfiable.
+        """
+        header = self.request.headers.get("range")
+        if not header:
+            return None
+        if_range = (self.request.headers.get("if-range") or "").strip()
+        if if_range and if_range not in (etag, last_modified):
+            return None
+        unit, _, spec = header.partition("=")
+        first, sep, last = spec.strip().partition("-")
+        if unit.strip().lower() != "bytes" or "," in spec or not sep:
+            return None
+        try:
+            if first:
+                start = int(first)
+                end = min(int(last), size - 1) if last else size - 1
+                if start > int(last or start):
+                    return None
+            else:
+                suffix = int(last)
+                if suffix <= 0:
+                    return False
+                start, end = max(0, size - suffix), size - 1
+        except ValueError:
+            return None
+        if start >= size:
+            return False
+        return start, end
+
+    async def _handle_static(self):
+        """Static files from the in-memory cache, with ETag / Last-Modified revalidation."""
+        req = self.request
+        path = _translate_path(self.directory, req.path)
+        if os.path.isdir(path):
+            if not req.path.endswith("/"):
+                location = req.path + "/" + (("?" + urlparse(req.target).query) if "?" in req.target else "")
+                return await self.send(301, [("Location", location)])
+            for index in ("index.html", "index.htm"):
+                if os.path.isfile(os.path.join(path, index)):
+                    path = os.path.join(path, index)
+                    break
+            else:
+                return await self._list_directory(path)
+
+        entry = _cached_file(path)
+        if entry is None:
+            return await self.send_error(404, "File not found")
+
+        validators = [
+            ("ETag", entry.etag),
+            ("Last-Modified", entry.last_modified),
+            ("Cache-Control", _static_cache_control(req.target, entry.etag)),
+        ]
+        if self._not_modified(entry):
+            return await self.send(304, validators)
+        headers = [("Content-Type", _guess_type(path))] + validators
+        if entry.body is not None:
+            return await self._send_file(headers, body=entry.body, etag=entry.etag, last_modified=entry.last_modified)
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return await self.send_error(404, "File not found")
+        with f:
+            await self._send_file(headers, f=f, etag=entry.etag, last_modified=entry.last_modified)
+
+    def _not_modified(self, entry):
+        inm = self.request.headers.get("if-none-match")
+        if inm is not None:
+            return _etag_matches(inm, entry.etag)
+        ims = self.request.headers.get("if-modified-since")
+        if ims:
             try:
-                with _cv:
-                    if _event_id == last_sent:
-                        _cv.wait(timeout=15.0)
-
-                if _event_id == last_sent:
-                    self.wfile.write(b": keepalive\n\n")
-                    self.wfile.flush()
-                    continue
-
-                payload = _last_payload.encode("utf-8")
-                msg = (b"id: " + str(_event_id).encode() + b"\n" +
-                       b"data: " + payload + b"\n\n")
-                self.wfile.write(msg)
-                self.wfile.flush()
-                last_sent = _event_id
-            except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError, OSError, Exception):
-                break
-                
-    def _handle_notify(self):
-        length = int(self.headers.get("Content-Length", "0"))
-        body = self.rfile.read(length) if length > 0 else b"{}"
-        try:
-            data = json.loads(body.decode("utf-8"))
-            if not isinstance(data, dict) or "changed" not in data:
-                raise ValueError("missing 'changed'")
-            global _event_id, _last_payload
-            with _cv:
-                _event_id += 1
-                _last_payload = json.dumps({"changed": list(data["changed"])})
-                _cv.notify_all()
-            self.send_response(204)
-            self.end_headers()
+                since = parsedate_to_datetime(ims).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return entry.sig[0] // 1_000_000_000 <= since
+        return False
+
+    async def _list_directory(self, path):
+        try:
+            names = sorted(os.listdir(path), key=str.lower)
+        except OSError:
+            return await self.send_error(404, "No permission to list directory")
+        title = "Directory listing for " + html.escape(unquote(self.request.path))
+        items = []
+        for name in names:
+            link = name + ("/" if os.path.isdir(os.path.join(path, name)) else "")
+            items.append(f'<li><a href="{quote(link)}">{html.escape(link)}</a></li>')
+        body = (f"<!DOCTYPE HTML><html><head><meta charset=\"utf-8\"><title>{title}</title></head>"
+                f"<body><h1>{title}</h1><hr><ul>{''.join(items)}</ul><hr></body></html>").encode("utf-8")
+        await self.send(200, [("Content-Type", "text/html; charset=utf-8")], body)
+
+
+def _is_state_path(path: str) -> bool:
+    p = urlparse(path).path
+    return p == "/state" or p.startswith("/state/")
+
+
+async def serve(bind="127.0.0.1", port=8324, directory=None, started=None):
+    """Run the overlay server on the current event loop until cancelled."""
+    directory = os.path.abspath(directory or os.getcwd())
+    clients = set()
+
+    async def on_client(reader, writer):
+        task = asyncio.current_task()
+        clients.add(task)
+        try:
+            await PushHandler(reader, writer, directory).handle()
+        except asyncio.CancelledError:
+            pass   # server shutting down
+        finally:
+            clients.discard(task)
+
+    server = await asyncio.start_server(on_client, bind, port)
+    if started is not None:
+        started(server)
+    try:
+        await server.serve_forever()
+    finally:
+        # Open SSE streams never finish on their own; end them with the server.
+        server.close()
+        for task in list(clients):
+            task.cancel()
+        await asyncio.gather(*clients, return_exceptions=True)
+
+
+class BackgroundServer:
+    """The server running on its own event loop thread (used when embedded in the GUI)."""
+
+    def __init__(self, bind="127.0.0.1", port=8324, directory=None):
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._server = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, args=(bind, port, directory),
+                                        name="OverlayServer", daemon=True)
+        self._thread.start()
+        self._ready.wait(5.0)
+        if self._error is not None:
+            raise self._error
+
+    def _run(self, bind, port, directory):
+        asyncio.set_event_loop(self.loop)
+        self._task = self.loop.create_task(serve(bind, port, directory, started=self._on_started))
+        try:
+            self.loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
         except Exception as e:
-            self.send_response(400)
-            self.end_headers()
-            self.wfile.write(str(e).encode("utf-8"))
-
-
-    def _handle_external(self):
-        try:
-            parsed = urlparse(self.path)
-            qs = parse_qs(parsed.query or "")
-            raw_path = (qs.get("path", [""])[0] or "").strip()
-            if not raw_path:
-                self.send_error(400, "Missing path")
-                return
-
-            target = os.path.abspath(unquote(raw_path))
-            if not os.path.isfile(target):
-                self.send_error(404, "File not found")
-                return
-
-            ctype = self.guess_type(target)
-            fs = os.stat(target)
-            self.send_response(200)
-            self.send_header("Content-Type", ctype)
-            self.send_header("Content-Length", str(fs.st_size))
-            self.end_headers()
-            with open(target, "rb") as f:
-                self.copyfile(f, self.wfile)
-        except Exception:
-            self.send_error(500, "Failed to read external file")
+            self._error = e
+        finally:
+            self._ready.set()
+            self.loop.close()
 
-    def do_GET(self):
-        if self.path.startswith("/events"):
-            return self._handle_events()
-        if self.path.startswith("/external"):
-            return self._handle_external()
-        return super().do_GET()
+    def _on_started(self, server):
+        self._server = server
+        self._ready.set()
+
+    def deliver(self, route, payload):
+        """
+        In-process equivalent of POSTing payload to route (/notify, /state, /statistics),
+        for the GUI that embeds this server: no socket, no HTTP parsing. Callable from
+        any thread; payload is kept as is, so the caller must not modify it afterwards.
+        """
+        if route == "/notify":
+            self.loop.call_soon_threadsafe(_events.publish, _notify_event(payload))
+        elif route == "/state":
+            _update_state(payload)
+        elif route == "/statistics":
+            _update_statistics(payload)
+        else:
+            raise ValueError(f"unknown route {route!r}")
+
+    def shutdown(self):
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self._task.cancel)
+        self._thread.join(2.0)
 
-    def do_POST(self):
-        if self.path.startswith("/notify"):
-            return self._handle_notify()
-        return super().do_POST()
 
 def main():
     p = argparse.ArgumentParser()
@@ -133,15 +986,15 @@ def main():
 
     base = os.path.abspath(args.root.strip('"')) if args.root else _default_base()
     os.chdir(base)
+    _attach_state_segment(state_segment_path(base))
 
-    httpd = SilentHTTPServer((args.bind, args.port), PushHandler)
     print("PLEASE KEEP THIS WINDOW OPEN")
     print("GUI MIGHT TAKE 5-15 seconds to open")
     print("This window is the required local server.")
     try:
-        httpd.serve_forever()
-    finally:
-        httpd.server_close()
+        asyncio.run(serve(args.bind, args.port, base))
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+import json
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from server import EventHub, _parse_topics  # noqa: E402
+
+
+def _decode(msg):
+    """b"id: <id>\\ndata: <json>\\n\\n" -> (id, event)."""
+    id_line, data_line = msg.decode("utf-8").strip().split("\n")
+    return id_line[len("id: "):], json.loads(data_line[len("data: "):])
+
+
+class ResumePointTest(unittest.TestCase):
+    def setUp(self):
+        self.hub = EventHub()
+        for _ in range(3):
+            self.hub.publish({"changed": ["maps"]})
+
+    def test_new_client_starts_at_current_event(self):
+        self.assertEqual(self.hub.resume_point(None), 3)
+        self.assertEqual(self.hub.resume_point(""), 3)
+
+    def test_own_id_resumes(self):
+        self.assertEqual(self.hub.resume_point(f"{self.hub.boot}-1"), 1)
+        self.assertEqual(self.hub.resume_point(f" {self.hub.boot}-3 "), 3)
+
+    def test_unknown_history_resets(self):
+        for last_id in ("0-1", f"{self.hub.boot}-4", f"{self.hub.boot}-x", "garbage", "5"):
+            with self.subTest(last_id=last_id):
+                self.assertIsNone(self.hub.resume_point(last_id))
+
+
+class SinceTest(unittest.TestCase):
+    def setUp(self):
+        self.hub = EventHub()
+
+    def test_nothing_new(self):
+        self.assertIsNone(self.hub.since(0))
+        self.hub.publish({"changed": ["maps"]})
+        self.assertIsNone(self.hub.since(1))
+
+    def test_single_event_is_sent_as_published(self):
+        self.hub.publish({"changed": ["t1.name"], "values": {"t1.name": "A"}})
+        msg_id, event = _decode(self.hub.since(0))
+        self.assertEqual(msg_id, f"{self.hub.boot}-1")
+        self.assertEqual(event, {"changed": ["t1.name"], "values": {"t1.name": "A"}})
+
+    def test_missed_events_are_merged(self):
+        self.hub.publish({"changed": ["t1.name"], "values": {"t1.name": "A"}})
+        self.hub.publish({"changed": ["maps", "t1.name"], "values": {"t1.name": "B"}})
+        self.hub.publish({"changed": ["t2.name"], "values": {"t2.name": "C"}})
+        msg_id, event = _decode(self.hub.since(0))
+        self.assertEqual(msg_id, f"{self.hub.boot}-3")
+        self.assertEqual(event["changed"], ["t1.name", "maps", "t2.name"])
+        self.assertEqual(event["values"], {"t1.name": "B", "t2.name": "C"})
+        _, event = _decode(self.hub.since(2))
+        self.assertEqual(event, {"changed": ["t2.name"], "values": {"t2.name": "C"}})
+
+    def test_change_without_value_drops_older_value(self):
+        self.hub.publish({"changed": ["t1.name"], "values": {"t1.name": "A"}})
+        self.hub.publish({"changed": ["t1.name"]})
+        _, event = _decode(self.hub.since(0))
+        self.assertEqual(event, {"changed": ["t1.name"]})
+
+    def test_topics_filter_merged_events(self):
+        topics = _parse_topics(["t1"])
+        self.hub.publish({"changed": ["maps"]})
+        self.assertIsNone(self.hub.since(0, topics))
+        self.hub.publish({"changed": ["t1.name", "t2.name"], "values": {"t1.name": "A", "t2.name": "B"}})
+        _, event = _decode(self.hub.since(1, topics))
+        self.assertEqual(event, {"changed": ["t1.name"], "values": {"t1.name": "A"}})
+        _, event = _decode(self.hub.since(0, topics))
+        self.assertEqual(event, {"changed": ["t1.name"], "values": {"t1.name": "A"}})
+
+    def test_reset_when_history_is_gone(self):
+        self.hub.publish({"changed": ["maps"]})
+        self.hub.publish({"changed": ["t1.name"]})
+        for _ in range(EventHub.LOG_SIZE):
+            self.hub.publish({"changed": ["t2.name"], "values": {"t2.name": "X"}})
+        for after_id in (None, 0, 1):
+            with self.subTest(after_id=after_id):
+                msg_id, event = _decode(self.hub.since(after_id))
+                self.assertEqual(msg_id, f"{self.hub.boot}-{self.hub.event_id}")
+                self.assertEqual(event, {"changed": ["maps", "t1.name", "t2.name"], "reset": True})
+        # The oldest event still in the log resumes normally.
+        _, event = _decode(self.hub.since(2))
+        self.assertNotIn("reset", event)
+        self.assertEqual(event["changed"], ["t2.name"])
+        _, event = _decode(self.hub.since(None, _parse_topics(["t1"])))
+        self.assertEqual(event, {"changed": ["t1.name"], "reset": True})
+        self.assertIsNone(self.hub.since(None, _parse_topics(["general"])))
+
+
+if __name__ == "__main__":
+    unittest.main()
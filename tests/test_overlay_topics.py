@@ -0,0 +1,54 @@
+import os
+import re
+import sys
+import unittest
+from urllib.parse import unquote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from server import _parse_topics, _topic_matches  # noqa: E402
+
+# Sections of the /render document -> the /notify key the GUI sends when they change.
+RENDER_KEYS = {
+    "team1": "t1",
+    "team2": "t2",
+    "statistics": "faceit.stats",
+    "players": "faceit.stats",
+    "teams": "faceit.stats",
+}
+RENDER_PAGES = ("team1.html", "team2.html")
+
+TOPICS_RE = re.compile(r"/events\?topics=([^'\"]+)['\"]")
+READ_RE = re.compile(r"\b(?:payload|js)\??\.(\w+)(?:\??\.(\w+))?")
+
+
+def _read_page(name):
+    with open(os.path.join(ROOT, "HTML", name), encoding="utf-8") as f:
+        return f.read()
+
+
+class RenderPageTopicsTest(unittest.TestCase):
+    """Pages that rebuild from /render must subscribe to every key they read from it."""
+
+    def test_reads_are_covered_by_topics(self):
+        for name in RENDER_PAGES:
+            source = _read_page(name)
+            found = TOPICS_RE.search(source)
+            self.assertIsNotNone(found, f"{name}: no /events?topics= subscription")
+            topics = _parse_topics([unquote(found.group(1))])
+            reads = set(READ_RE.findall(source))
+            self.assertTrue(reads, f"{name}: no payload reads found")
+            for section, sub in sorted(reads):
+                if section == "general":
+                    key = f"general.{sub}" if sub else "general"
+                else:
+                    key = RENDER_KEYS.get(section)
+                    if key is None:
+                        continue
+                with self.subTest(page=name, read=f"{section}.{sub}" if sub else section):
+                    self.assertTrue(_topic_matches(topics, key), f"{name}: {key} not in topics {topics}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from server import PushHandler, Request  # noqa: E402
+
+SIZE = 1000
+ETAG = '"abc"'
+LAST_MODIFIED = "Sat, 17 Oct 2026 12:00:00 GMT"
+
+
+def _requested_range(headers, size=SIZE):
+    handler = PushHandler(None, None, ROOT)
+    handler.request = Request("GET", "/video.mp4", "HTTP/1.1", headers, b"")
+    return handler._requested_range(size, ETAG, LAST_MODIFIED)
+
+
+class RequestedRangeTest(unittest.TestCase):
+    def test_ranges(self):
+        cases = {
+            "bytes=0-99": (0, 99),
+            "bytes=100-": (100, SIZE - 1),
+            "bytes=900-5000": (900, SIZE - 1),
+            "bytes=999-999": (999, SIZE - 1),
+            "bytes=-100": (SIZE - 100, SIZE - 1),
+            "bytes=-5000": (0, SIZE - 1),
+            " Bytes = 10-19": (10, 19),
+        }
+        for header, expected in cases.items():
+            with self.subTest(range=header):
+                self.assertEqual(_requested_range({"range": header}), expected)
+
+    def test_unsatisfiable(self):
+        for header in ("bytes=1000-", "bytes=1000-1999", "bytes=-0"):
+            with self.subTest(range=header):
+                self.assertIs(_requested_range({"range": header}), False)
+        self.assertIs(_requested_range({"range": "bytes=0-"}, size=0), False)
+
+    def test_whole_file(self):
+        for header in ("", "items=0-9", "bytes=0-9,20-29", "bytes=10", "bytes=a-b", "bytes=20-10", "bytes=-"):
+            with self.subTest(range=header):
+                self.assertIsNone(_requested_range({"range": header}))
+        self.assertIsNone(_requested_range({}))
+
+    def test_if_range(self):
+        for validator in (ETAG, LAST_MODIFIED):
+            with self.subTest(if_range=validator):
+                self.assertEqual(_requested_range({"range": "bytes=0-9", "if-range": validator}), (0, 9))
+        for validator in ('"old"', "Fri, 16 Oct 2026 12:00:00 GMT"):
+            with self.subTest(if_range=validator):
+                self.assertIsNone(_requested_range({"range": "bytes=0-9", "if-range": validator}))
+
+
+if __name__ == "__main__":
+    unittest.main()
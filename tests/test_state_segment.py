@@ -0,0 +1,124 @@
+import os
+import struct
+import sys
+import tempfile
+import threading
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from server import StateSegment  # noqa: E402
+
+SIZE = 4096
+
+
+def _seq(seg):
+    return struct.unpack_from("<Q", seg._mm, StateSegment.SEQ_OFFSET)[0]
+
+
+class StateSegmentTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "test.state")
+        self._open = []
+
+    def tearDown(self):
+        for seg in self._open:
+            seg.close()
+        self._tmp.cleanup()
+
+    def _create(self, size=SIZE):
+        seg = StateSegment.create(self.path, size)
+        self._open.append(seg)
+        return seg
+
+    def _reader(self):
+        seg = StateSegment.open(self.path)
+        self.assertIsNotNone(seg)
+        self._open.append(seg)
+        return seg
+
+    def test_round_trip(self):
+        writer = self._create()
+        reader = self._reader()
+        self.assertEqual(reader.read()[1], None)   # created, nothing written yet
+        self.assertTrue(writer.write(b'{"a": 1}'))
+        seq, body = reader.read()
+        self.assertEqual(body, b'{"a": 1}')
+        self.assertEqual(seq % 2, 0)
+        self.assertEqual(reader.read(seq), (seq, None))
+        self.assertTrue(writer.write(b"{}"))
+        seq2, body = reader.read(seq)
+        self.assertGreater(seq2, seq)
+        self.assertEqual(body, b"{}")
+
+    def test_oversize_write_is_refused(self):
+        writer = self._create()
+        self.assertTrue(writer.write(b"x" * writer.capacity))
+        self.assertFalse(writer.write(b"x" * (writer.capacity + 1)))
+        self.assertEqual(self._reader().read()[1], b"x" * writer.capacity)
+
+    def test_writer_restart_bumps_sequence(self):
+        first = self._create()
+        first.write(b'{"old": true}')
+        reader = self._reader()
+        seq, _ = reader.read()
+        first.close()
+        self._open.remove(first)
+
+        # A restarted GUI starts empty: readers must not keep the old snapshot's sequence.
+        second = self._create()
+        seq2, body = reader.read(seq)
+        self.assertNotEqual(seq2, seq)
+        self.assertEqual(seq2 % 2, 0)
+        self.assertIsNone(body)
+        second.write(b'{"new": true}')
+        self.assertEqual(reader.read(seq2)[1], b'{"new": true}')
+
+    def test_busy_writer_gives_up(self):
+        writer = self._create()
+        writer.write(b"{}")
+        reader = self._reader()
+        struct.pack_into("<Q", writer._mm, StateSegment.SEQ_OFFSET, _seq(writer) + 1)
+        self.assertIsNone(reader.read())
+
+    def test_torn_reads_are_retried(self):
+        writer = self._create()
+        reader = self._reader()
+        stop = threading.Event()
+
+        def write_loop():
+            n = 0
+            while not stop.is_set():
+                n += 1
+                writer.write(bytes([65 + n % 26]) * (1 + n % 1000))
+
+        thread = threading.Thread(target=write_loop)
+        thread.start()
+        try:
+            seen = 0
+            for _ in range(2000):
+                result = reader.read()
+                if result is None or result[1] is None:
+                    continue
+                body = result[1]
+                self.assertEqual(body, body[:1] * len(body), "torn snapshot returned")
+                seen += 1
+        finally:
+            stop.set()
+            thread.join()
+        self.assertGreater(seen, 0)
+
+    def test_open_without_segment(self):
+        self.assertIsNone(StateSegment.open(self.path))
+        with open(self.path, "wb") as f:
+            f.write(b"short")
+        self.assertIsNone(StateSegment.open(self.path))
+        with open(self.path, "wb") as f:
+            f.write(b"\0" * SIZE)
+        self.assertIsNone(StateSegment.open(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()